@@ -6,44 +6,57 @@ import re
 from discord.ext import commands
 
 
-from utils.config import DISCORD_BOT_TOKEN
+from utils.config import DISCORD_BOT_TOKEN, DISCORD_MAX_MESSAGES
 from utils.localization import translate
 from utils.logger import bot_logger, error_logger
+from utils.memory import register_size
+from utils.request_context import request_scope, track_stage
+from utils.generic import server_locale, discord_server_name
 from services.gemini import get_gemini_response, get_current_model
 from utils.context import get_context_prompt
 from utils.localization import detect_system_language, load_language
 
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = commands.Bot(
+    command_prefix="!", intents=intents, max_messages=DISCORD_MAX_MESSAGES
+)
+register_size("discord_messages", lambda: len(bot.cached_messages))
 
 
 async def handle_chatty_interaction(message: discord.Message, user_message: str):
     """
     Handle user messages directed to the bot and get a Gemini response.
     """
-    server_name = message.guild.name if message.guild else f"DM-{message.author.name}"
-    context_prompt = get_context_prompt(server_name)
-
-    # Compose the final prompt
-    if context_prompt:
-        full_prompt = context_prompt.strip() + "\n\n" + user_message
-        bot_logger.info("Context applied for server '%s'", server_name)
-    else:
-        full_prompt = user_message
-
-    response = get_gemini_response(full_prompt)
-
-    if response:
-        await message.channel.send(response)
-        preview = response[:100] + "..." if len(response) > 100 else response
-        bot_logger.info(
-            "Gemini response sent to %s: %s",
-            message.author.display_name,
-            preview,
-        )
-    else:
-        await message.channel.send(translate("gemini_error"))
+    server_name = discord_server_name(message)
+    with server_locale(server_name), request_scope(
+        "discord", "message", server_name, message.author.id, message.created_at
+    ):
+        with track_stage("context"):
+            context_prompt = get_context_prompt(server_name)
+
+        # Compose the final prompt
+        if context_prompt:
+            full_prompt = context_prompt.strip() + "\n\n" + user_message
+            bot_logger.info("Context applied for server '%s'", server_name)
+        else:
+            full_prompt = user_message
+
+        response = get_gemini_response(full_prompt)
+
+        with track_stage("send"):
+            if response:
+                await message.channel.send(response)
+            else:
+                await message.channel.send(translate("gemini_error"))
+
+        if response:
+            preview = response[:100] + "..." if len(response) > 100 else response
+            bot_logger.info(
+                "Gemini response sent to %s: %s",
+                message.author.display_name,
+                preview,
+            )
 
 
 @bot.event
@@ -11,7 +11,15 @@ import asyncio
 
 from bot_discord import start_discord
 from bot_telegram import start_telegram
+from services.http_client import start_http_client, close_http_client
+from services.cache_warmer import cache_warmer
 from utils.localization import detect_system_language, load_language
+from utils.logger import stop_logging
+from utils.db_utils import close_db
+from utils.metrics import start_metrics_server, stop_metrics_server
+from utils.loop_watchdog import loop_watchdog
+from utils.memory import start_tracing
+from utils.config import MEMORY_TRACE_ON_START
 
 
 def parse_args():
@@ -36,7 +44,21 @@ async def main():
         print("Usage: python bot_launcher.py [discord] [telegram]")
         return
 
-    await asyncio.gather(*tasks)
+    if MEMORY_TRACE_ON_START:
+        start_tracing()
+    await start_http_client()
+    metrics_handles = await start_metrics_server()
+    watchdog_task = asyncio.create_task(loop_watchdog.run())
+    warmer_task = asyncio.create_task(cache_warmer.run())
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        warmer_task.cancel()
+        watchdog_task.cancel()
+        await stop_metrics_server(metrics_handles)
+        await close_http_client()
+        close_db()
+        stop_logging()
 
 
 if __name__ == "__main__":
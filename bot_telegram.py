@@ -18,8 +18,12 @@ from telegram.ext import (
 )
 
 from utils.localization import detect_system_language, load_language
-from utils.generic import resolve_server_name
+from utils.generic import (
+    resolve_server_name,
+    track_telegram_request,
+)
 from utils.logger import bot_logger
+from utils.request_context import track_stage, set_request_outcome
 from core.handler import process_text
 from utils.context import get_context_prompt
 from utils.config import TELEGRAM_BOT_TOKEN
@@ -46,6 +50,7 @@ for name in telegram_loggers:
     logger.propagate = False
 
 
+@track_telegram_request("start")
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Responds to the /start command.
@@ -53,6 +58,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(translate("start_message"))
 
 
+@track_telegram_request("message")
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Handles regular user messages sent in private or group chats.
@@ -84,16 +90,19 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         elif is_reply_to_bot:
             pass  # allow reply without cleaning
         else:
+            set_request_outcome("ignored")
             return  # Ignore messages that don't start with "chatty" or "coffy"
 
     server_name = resolve_server_name(user, chat)
-    context_prompt = get_context_prompt(server_name)
+    with track_stage("context"):
+        context_prompt = get_context_prompt(server_name)
     response = process_text(text, context_prompt)
 
-    if response:
-        await update.message.reply_text(response)
-    else:
-        await update.message.reply_text(translate("gemini_error"))
+    with track_stage("send"):
+        if response:
+            await update.message.reply_text(response)
+        else:
+            await update.message.reply_text(translate("gemini_error"))
 
 
 async def start_telegram():
@@ -1,5 +1,6 @@
 # cogs/chatty.py
 
+import asyncio
 import discord
 
 from discord.ext import commands
@@ -8,10 +9,13 @@ from typing import Optional
 
 from utils.localization import translate
 from utils.db_utils import log_to_sqlite
-from utils.generic import read_file_content, handle_errors
+from utils.generic import handle_errors, discord_server_name
+from utils.attachments import read_attachments
 from utils.logger import bot_logger
+from utils.request_context import track_stage
 from utils.context import get_context_prompt
-from core.handler import process_text
+from utils.config import LONGDOC_MAX_CHARS, MAX_DOC_LENGTH, ATTACHMENT_TOKEN_BUDGET
+from core.handler import process_text, summarize_document
 
 
 class ChattyGemini(commands.Cog):
@@ -24,6 +28,9 @@ class ChattyGemini(commands.Cog):
     @app_commands.describe(
         prompt="Your question or request for Coffy",
         allegato="(Optional) Attachment to analyze",
+        allegato2="(Optional) Second attachment",
+        allegato3="(Optional) Third attachment",
+        lungo="(Optional) Long-document mode: summarize the whole attachments",
     )
     @handle_errors("chatty")
     async def chatty(
@@ -31,16 +38,56 @@ class ChattyGemini(commands.Cog):
         interaction,
         prompt: str,
         allegato: Optional[discord.Attachment] = None,
+        allegato2: Optional[discord.Attachment] = None,
+        allegato3: Optional[discord.Attachment] = None,
+        lungo: Optional[bool] = False,
     ):
         await interaction.response.defer()
 
+        attachments = [a for a in (allegato, allegato2, allegato3) if a]
         attachment_texts = []
-        if allegato:
-            result = await read_file_content(allegato)
-            if result.startswith("⚠️") or result.startswith("❌"):
-                await interaction.followup.send(result)
-                return
-            attachment_texts.append(result)
+        images = []
+        if attachments:
+            with track_stage("extract"):
+                if lungo:
+                    attachment_texts, images, status_lines = await read_attachments(
+                        attachments, LONGDOC_MAX_CHARS, max_tokens=None
+                    )
+                else:
+                    attachment_texts, images, status_lines = await read_attachments(
+                        attachments, MAX_DOC_LENGTH, ATTACHMENT_TOKEN_BUDGET
+                    )
+            if status_lines:
+                await interaction.followup.send("\n".join(status_lines))
+
+            if lungo and attachment_texts:
+
+                # Documents share one progress message: report the sum of
+                # their chunks, each document updating its own counters
+                progress = {}  # document index -> (done, total)
+
+                def progress_for(index):
+                    async def show_progress(done, total):
+                        progress[index] = (done, total)
+                        await interaction.edit_original_response(
+                            content=translate(
+                                "longdoc_progress",
+                                done=sum(d for d, _ in progress.values()),
+                                total=sum(t for _, t in progress.values()),
+                            )
+                        )
+
+                    return show_progress
+
+                attachment_texts = await asyncio.gather(
+                    *(
+                        summarize_document(t, progress_for(i))
+                        for i, t in enumerate(attachment_texts)
+                    )
+                )
+                if None in attachment_texts:
+                    await interaction.followup.send(translate("gemini_error"))
+                    return
 
         final_prompt = prompt
         if attachment_texts:
@@ -62,8 +109,9 @@ class ChattyGemini(commands.Cog):
             prompt[:100],
         )
 
-        server_name = interaction.guild.name if interaction.guild else "DM"
-        context_prompt = get_context_prompt(server_name)
+        server_name = discord_server_name(interaction)
+        with track_stage("context"):
+            context_prompt = get_context_prompt(server_name)
 
         if context_prompt:
             full_prompt = context_prompt.strip() + "\n\n" + final_prompt
@@ -71,29 +119,33 @@ class ChattyGemini(commands.Cog):
         else:
             full_prompt = final_prompt
 
-        response_text = process_text(full_prompt)
+        response_text = process_text(full_prompt, images=images)
 
         if response_text is None:
             await interaction.followup.send(translate("gemini_error"))
             return
 
-        log_to_sqlite(
-            interaction.user, interaction.channel, final_prompt, response_text
-        )
-
-        if len(response_text) <= 4096:
-            embed = discord.Embed(
-                title=translate("response_title"),
-                description=response_text,
-                color=discord.Color.green(),
-            )
-            embed.set_footer(
-                text=translate("response_footer", user=interaction.user.display_name),
-                icon_url=interaction.user.display_avatar.url,
+        with track_stage("db"):
+            log_to_sqlite(
+                interaction.user, interaction.channel, final_prompt, response_text
             )
-            await interaction.followup.send(embed=embed)
-        else:
-            await interaction.followup.send(response_text)
+
+        with track_stage("send"):
+            if len(response_text) <= 4096:
+                embed = discord.Embed(
+                    title=translate("response_title"),
+                    description=response_text,
+                    color=discord.Color.green(),
+                )
+                embed.set_footer(
+                    text=translate(
+                        "response_footer", user=interaction.user.display_name
+                    ),
+                    icon_url=interaction.user.display_avatar.url,
+                )
+                await interaction.followup.send(embed=embed)
+            else:
+                await interaction.followup.send(response_text)
 
 
 async def setup(bot):
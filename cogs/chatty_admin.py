@@ -1,22 +1,47 @@
 # cogs/chatty_admin.py
 
 import discord
+import io
 import os
 import sqlite3
 
+from datetime import datetime
+
 from discord.ext import commands
 from discord import app_commands, Interaction
 
-from utils.localization import translate
-from utils.generic import handle_errors, check_discord_dm, check_discord_admin
+from utils.localization import translate, available_languages
+from utils.generic import (
+    handle_errors,
+    check_discord_dm,
+    check_discord_admin,
+    discord_server_name,
+)
 from services.gemini import (
     change_model,
     get_supported_models,
     get_current_model,
 )
 from utils.logger import bot_logger, error_logger
-from utils.context import set_context_file, reset_context, get_server_context
-from utils.config import DB_FILE
+from utils.context import (
+    set_context_file,
+    reset_context,
+    get_server_context,
+    set_locale,
+    reset_locale,
+)
+from utils.config import (
+    DB_FILE,
+    PERF_WINDOW,
+    PERF_MAX_WINDOW,
+    PROFILER_SECONDS,
+    PROFILER_MAX_SECONDS,
+)
+from utils.cache import format_cache_stats
+from utils.perf import format_perf_report
+from utils.profiler import run_profile, is_profiling
+from utils.loop_watchdog import loop_watchdog
+from utils.memory import run_memory_action, MEMORY_ACTIONS
 
 
 class ChattyAdmin(commands.Cog):
@@ -84,11 +109,7 @@ class ChattyAdmin(commands.Cog):
         if not filename.endswith(".txt"):
             filename += ".txt"
 
-        server_name = (
-            interaction.guild.name
-            if interaction.guild
-            else f"DM-{interaction.user.name}"
-        )
+        server_name = discord_server_name(interaction)
 
         result = set_context_file(server_name, filename)
 
@@ -128,11 +149,7 @@ class ChattyAdmin(commands.Cog):
         """
         if not await check_discord_admin(interaction):
             return
-        server_name = (
-            interaction.guild.name
-            if interaction.guild
-            else f"DM-{interaction.user.name}"
-        )
+        server_name = discord_server_name(interaction)
 
         reset_context(server_name)
         bot_logger.info(
@@ -144,6 +161,75 @@ class ChattyAdmin(commands.Cog):
             translate("context_reset"), ephemeral=True
         )
 
+    # --- LOCALE SET ---
+    @app_commands.command(
+        name="chatty-admin-locale",
+        description="Set the language for this server (ADMIN only)",
+    )
+    @app_commands.describe(lingua="Language code (e.g., it, en)")
+    @handle_errors("chatty-admin-locale")
+    async def chatty_locale(self, interaction, lingua: str):
+        """
+        Set the locale used for messages, Wikipedia and weather on this server.
+
+        Args:
+            interaction (Interaction): The command interaction.
+            lingua (str): Language code.
+        """
+        if not await check_discord_admin(interaction):
+            return
+        server_name = discord_server_name(interaction)
+        lingua = lingua.strip().lower()
+
+        if set_locale(server_name, lingua):
+            bot_logger.info(
+                "Locale set to '%s' by %s (ID: %s)",
+                lingua,
+                interaction.user.display_name,
+                interaction.user.id,
+            )
+            await interaction.response.send_message(
+                translate("locale_set", lang=lingua, locale=lingua), ephemeral=True
+            )
+        else:
+            await interaction.response.send_message(
+                translate("invalid_locale", langs=", ".join(available_languages())),
+                ephemeral=True,
+            )
+
+    @chatty_locale.autocomplete("lingua")
+    async def autocomplete_locales(self, interaction: Interaction, current: str):
+        return [
+            app_commands.Choice(name=lang, value=lang)
+            for lang in available_languages()
+            if lang.startswith(current.lower())
+        ][:25]
+
+    # --- LOCALE RESET ---
+    @app_commands.command(
+        name="chatty-admin-locale-reset",
+        description="Reset the language for this server (ADMIN only)",
+    )
+    @handle_errors("chatty-admin-locale-reset")
+    async def chatty_locale_reset(self, interaction):
+        """
+        Reset the locale of the current server to the defaults.
+
+        Args:
+            interaction (Interaction): The command interaction.
+        """
+        if not await check_discord_admin(interaction):
+            return
+        reset_locale(discord_server_name(interaction))
+        bot_logger.info(
+            "Locale reset by %s (ID: %s)",
+            interaction.user.display_name,
+            interaction.user.id,
+        )
+        await interaction.response.send_message(
+            translate("locale_reset"), ephemeral=True
+        )
+
     @app_commands.command(
         name="chatty-admin-stats",
         description="\ud83d\udcca Show bot statistics  (ADMIN+DM only)",
@@ -175,6 +261,11 @@ class ChattyAdmin(commands.Cog):
             value=server_context_info,
             inline=False,
         )
+        embed.add_field(
+            name=translate("embed_cache_title"),
+            value=format_cache_stats(),
+            inline=False,
+        )
         await interaction.response.send_message(embed=embed)
         bot_logger.info(
             "Bot stats requested via DM by %s (ID: %s)",
@@ -182,6 +273,171 @@ class ChattyAdmin(commands.Cog):
             interaction.user.id,
         )
 
+    @app_commands.command(
+        name="chatty-admin-perf",
+        description="\ud83d\udcc8 Show live performance figures (ADMIN+DM only)",
+    )
+    @app_commands.describe(minuti="Window in minutes (default 5)")
+    @handle_errors("chatty-admin-perf")
+    async def chatty_perf(
+        self,
+        interaction,
+        minuti: app_commands.Range[int, 1, PERF_MAX_WINDOW // 60] = PERF_WINDOW // 60,
+    ):
+        """
+        Show latency percentiles per command and service, request and error
+        rates, cache hit ratios, queue depths and memory over a sliding window.
+
+        Args:
+            interaction (Interaction): The command interaction.
+            minuti (int): Window length in minutes.
+        """
+        if not await check_discord_dm(interaction):
+            return
+        if not await check_discord_admin(interaction):
+            return
+        report = format_perf_report(minuti * 60)
+        await interaction.response.send_message(f"```\n{report[:1900]}\n```")
+        bot_logger.info(
+            "Performance report requested via DM by %s (ID: %s)",
+            interaction.user.display_name,
+            interaction.user.id,
+        )
+
+    @app_commands.command(
+        name="chatty-admin-profile",
+        description="\ud83d\udd2c Run the sampling profiler for N seconds (ADMIN+DM only)",
+    )
+    @app_commands.describe(secondi="Duration in seconds (default 10)")
+    @handle_errors("chatty-admin-profile")
+    async def chatty_profile(
+        self,
+        interaction,
+        secondi: app_commands.Range[int, 1, PROFILER_MAX_SECONDS] = PROFILER_SECONDS,
+    ):
+        """
+        Sample the stacks of every thread for some seconds and send back a
+        collapsed-stack file and a top-functions summary.
+
+        Args:
+            interaction (Interaction): The command interaction.
+            secondi (int): Profile duration in seconds.
+        """
+        if not await check_discord_dm(interaction):
+            return
+        if not await check_discord_admin(interaction):
+            return
+        if is_profiling():
+            await interaction.response.send_message(translate("profile_busy"))
+            return
+
+        await interaction.response.defer(thinking=True)
+        result = await run_profile(secondi)
+        if result is None:
+            await interaction.followup.send(translate("profile_busy"))
+            return
+
+        stamp = result.created_at.strftime("%Y%m%d-%H%M%S")
+        await interaction.followup.send(
+            translate("profile_done", seconds=secondi, samples=result.samples),
+            files=[
+                discord.File(
+                    io.BytesIO(result.collapsed().encode("utf-8")),
+                    filename=f"profile-{stamp}.collapsed.txt",
+                ),
+                discord.File(
+                    io.BytesIO(result.summary().encode("utf-8")),
+                    filename=f"profile-{stamp}-top.txt",
+                ),
+            ],
+        )
+        bot_logger.info(
+            "Profile of %ss requested via DM by %s (ID: %s)",
+            secondi,
+            interaction.user.display_name,
+            interaction.user.id,
+        )
+
+    @app_commands.command(
+        name="chatty-admin-loop",
+        description="\ud83d\udd04 Event loop health and asyncio debug mode (ADMIN+DM only)",
+    )
+    @app_commands.describe(debug="Turn asyncio debug mode on or off")
+    @handle_errors("chatty-admin-loop")
+    async def chatty_loop(self, interaction, debug: bool = None):
+        """
+        Show the event loop lag and stall count, optionally switching asyncio
+        debug mode (slow callback reports) on or off.
+
+        Args:
+            interaction (Interaction): The command interaction.
+            debug (bool, optional): New asyncio debug state.
+        """
+        if not await check_discord_dm(interaction):
+            return
+        if not await check_discord_admin(interaction):
+            return
+        if debug is not None:
+            loop_watchdog.set_debug(debug)
+            bot_logger.info(
+                "asyncio debug set to %s by %s (ID: %s)",
+                debug,
+                interaction.user.display_name,
+                interaction.user.id,
+            )
+        await interaction.response.send_message(
+            translate(
+                "loop_status",
+                lag=f"{loop_watchdog.last_lag * 1000:.1f}",
+                stalls=loop_watchdog.stalls,
+                debug="ON" if loop_watchdog.is_debug() else "OFF",
+            )
+        )
+
+    @app_commands.command(
+        name="chatty-admin-memory",
+        description="\ud83e\udde0 Memory snapshots and growth diff (ADMIN+DM only)",
+    )
+    @app_commands.describe(
+        azione="diff (default), start tracing, new baseline or stop tracing"
+    )
+    @app_commands.choices(
+        azione=[app_commands.Choice(name=a, value=a) for a in MEMORY_ACTIONS]
+    )
+    @handle_errors("chatty-admin-memory")
+    async def chatty_memory(self, interaction, azione: str = "diff"):
+        """
+        Start or stop tracemalloc, reset the baseline, or send the top growing
+        allocation sites and the sizes of known caches.
+
+        Args:
+            interaction (Interaction): The command interaction.
+            azione (str): One of MEMORY_ACTIONS.
+        """
+        if not await check_discord_dm(interaction):
+            return
+        if not await check_discord_admin(interaction):
+            return
+        await interaction.response.defer(thinking=True)
+        key, report = await run_memory_action(azione)
+        if report is None:
+            await interaction.followup.send(translate(key))
+        else:
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            await interaction.followup.send(
+                translate(key),
+                file=discord.File(
+                    io.BytesIO(report.encode("utf-8")),
+                    filename=f"memory-{stamp}.txt",
+                ),
+            )
+        bot_logger.info(
+            "Memory action '%s' requested via DM by %s (ID: %s)",
+            azione,
+            interaction.user.display_name,
+            interaction.user.id,
+        )
+
     @app_commands.command(
         name="chatty-admin-activity",
         description="\ud83d\udcc5 Show daily message activity (last 7 days, ADMIN+DM only)",
@@ -8,7 +8,7 @@ from discord.ext import commands
 
 
 from utils.localization import translate
-from utils.generic import handle_errors
+from utils.generic import handle_errors, discord_server_name
 from services.gemini import get_current_model
 from utils.logger import bot_logger
 from utils.context import get_context_prompt
@@ -27,7 +27,7 @@ class ChattyStatus(commands.Cog):
         """
         Display bot info including uptime, active model, and version.
         """
-        server_name = interaction.guild.name if interaction.guild else "DM"
+        server_name = discord_server_name(interaction)
         context_content = get_context_prompt(server_name)
         context_file = "Active" if context_content else "None"
 
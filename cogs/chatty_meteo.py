@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 from core.handler import fetch_weather
+from services.geocoding import suggest_cities
 from utils.localization import translate
 from utils.generic import handle_errors
 from utils.logger import bot_logger, error_logger
@@ -82,6 +83,15 @@ class ChattyMeteo(commands.Cog):
         weather_response = await fetch_weather(citta, requested_date.date())
         await interaction.followup.send(weather_response)
 
+    @weather_command.autocomplete("citta")
+    async def autocomplete_cities(self, interaction: Interaction, current: str):
+        if not current.strip():
+            return []
+        return [
+            app_commands.Choice(name=city, value=city)
+            for city in suggest_cities(current)
+        ][:25]
+
 
 async def setup(bot):
     await bot.add_cog(ChattyMeteo(bot))
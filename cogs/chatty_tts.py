@@ -1,14 +1,16 @@
 # cogs/chatty_tts.py
 
+import io
 import discord
 
 from discord.ext import commands
 from discord import app_commands, Interaction
+from typing import Optional
 
 from utils.localization import translate
-from utils.generic import handle_errors, safe_delete
+from utils.generic import handle_errors
 from utils.logger import bot_logger, error_logger
-from core.handler import process_tts
+from core.handler import process_tts, process_tts_progressive
 
 
 class ChattyTTS(commands.Cog):
@@ -18,15 +20,21 @@ class ChattyTTS(commands.Cog):
     @app_commands.command(
         name="chatty-tts", description="Generate audio from text (text-to-speech)"
     )
-    @app_commands.describe(testo="Text to convert to audio")
+    @app_commands.describe(
+        testo="Text to convert to audio",
+        progressivo="(Optional) Send long texts as successive audio parts",
+    )
     @handle_errors("chatty-tts")
-    async def chatty_tts(self, interaction, testo: str):
+    async def chatty_tts(
+        self, interaction, testo: str, progressivo: Optional[bool] = False
+    ):
         """
         Generate a TTS audio response from the provided text.
 
         Args:
             interaction (Interaction): The command interaction.
             testo (str): Text to convert to audio.
+            progressivo (bool, optional): Send each part as soon as it is ready.
         """
         if not testo.strip():
             await interaction.response.send_message(
@@ -49,13 +57,34 @@ class ChattyTTS(commands.Cog):
             preview,
         )
 
-        audio_file = process_tts(testo)
-        if audio_file:
+        if progressivo:
+            part = 0
+            async for audio in process_tts_progressive(testo):
+                if audio is None:
+                    error_logger.error(
+                        "TTS generation failed for %s", interaction.user.display_name
+                    )
+                    await interaction.followup.send(translate("tts_error"))
+                    return
+                part += 1
+                await interaction.followup.send(
+                    file=discord.File(io.BytesIO(audio), filename=f"tts_{part}.mp3")
+                )
+            bot_logger.info(
+                "TTS audio sent in %d parts for %s",
+                part,
+                interaction.user.display_name,
+            )
+            return
+
+        audio = await process_tts(testo)
+        if audio:
             bot_logger.info(
                 "TTS audio generated successfully for %s", interaction.user.display_name
             )
-            await interaction.followup.send(file=discord.File(audio_file))
-            safe_delete(audio_file)
+            await interaction.followup.send(
+                file=discord.File(io.BytesIO(audio), filename="tts.mp3")
+            )
         else:
             error_logger.error(
                 "TTS generation failed for %s", interaction.user.display_name
@@ -5,42 +5,176 @@ Central logic module for processing user inputs and delegating to services.
 This decouples bot commands from the implementation details of each feature.
 """
 
-from services.gemini import get_gemini_response
-from services.google_tts import generate_tts_audio
+import asyncio
+import hashlib
+
+from services.gemini import (
+    get_gemini_response,
+    get_gemini_response_async,
+    get_current_model,
+)
+from services.google_tts import generate_tts_audio, iter_tts_audio
 from services.weather import get_weather as weather_service
 from services.wikipedia import search_wikipedia as wikipedia_service
+from services.cache_warmer import record_weather_request, record_wiki_request
 from utils.logger import service_logger
-
-
-def process_text(prompt: str, context: str = None) -> str | None:
+from utils.request_context import track_stage
+from utils.cache import LRUCache
+from utils.text import estimate_tokens, split_into_chunks
+from utils.config import (
+    LONGDOC_CHUNK_TOKENS,
+    LONGDOC_MAX_CONCURRENCY,
+    LONGDOC_CACHE_SIZE,
+)
+
+# --- Long-document prompts ---
+MAP_PROMPT = (
+    "Summarize part {index} of {total} of a document. Keep every fact, name, "
+    "number and conclusion, and write in the language of the document.\n\n{chunk}"
+)
+REDUCE_PROMPT = (
+    "Merge these consecutive partial summaries of the same document into one "
+    "summary. Keep every fact, name, number and conclusion.\n\n{summaries}"
+)
+
+summary_cache = LRUCache("longdoc_summaries", LONGDOC_CACHE_SIZE)
+
+
+def process_text(prompt: str, context: str = None, images=None) -> str | None:
     """
     Generate a Gemini AI response from the provided prompt and optional context.
 
     Args:
         prompt (str): The user message or query.
         context (str, optional): Optional context string to prepend.
+        images (list[dict], optional): Inline image parts sent with the prompt.
 
     Returns:
         str | None: The generated response text, or None on failure.
     """
     final_prompt = f"{context.strip()}\n\n{prompt}" if context else prompt
-    service_logger.info("Processing Gemini prompt (len=%d)", len(final_prompt))
-    return get_gemini_response(final_prompt)
+    service_logger.info(
+        "Processing Gemini prompt (len=%d, images=%d)",
+        len(final_prompt),
+        len(images or []),
+    )
+    return get_gemini_response(final_prompt, images)
+
 
+def _group_by_budget(texts: list[str], max_tokens: int) -> list[list[str]]:
+    """
+    Group consecutive texts so each group fits the token budget.
+    Groups always hold at least two texts, so every reduce round shrinks the list.
+    """
+    groups, current, used = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if len(current) >= 2 and used + tokens > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += tokens
+    if len(current) == 1 and groups:
+        groups[-1].extend(current)
+    elif current:
+        groups.append(current)
+    return groups
+
+
+async def summarize_document(text: str, on_progress=None) -> str | None:
+    """
+    Summarize a long document with a parallel map-reduce over Gemini.
 
-def process_tts(text: str) -> str | None:
+    The text is split into token-bounded chunks that are summarized concurrently
+    (at most LONGDOC_MAX_CONCURRENCY at a time); the partial summaries are then
+    merged until they fit a single chunk. Results are cached per document hash.
+
+    Args:
+        text (str): Full extracted document text.
+        on_progress (callable, optional): Coroutine called as on_progress(done, total)
+            before the first chunk and after each chunk is summarized.
+
+    Returns:
+        str | None: Condensed document text, or None if a Gemini call failed.
+    """
+    if estimate_tokens(text) <= LONGDOC_CHUNK_TOKENS:
+        return text
+
+    doc_key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), get_current_model())
+    cached = summary_cache.get(doc_key)
+    if cached:
+        service_logger.info("Long document summary served from cache")
+        return cached
+
+    chunks = split_into_chunks(text, LONGDOC_CHUNK_TOKENS)
+    total = len(chunks)
+    semaphore = asyncio.Semaphore(LONGDOC_MAX_CONCURRENCY)
+    done = 0
+
+    async def run(prompt):
+        async with semaphore:
+            return await get_gemini_response_async(prompt)
+
+    async def summarize_chunk(index, chunk):
+        nonlocal done
+        summary = await run(
+            MAP_PROMPT.format(index=index + 1, total=total, chunk=chunk)
+        )
+        done += 1
+        if on_progress:
+            await on_progress(done, total)
+        return summary
+
+    service_logger.info("Summarizing long document: %d chunks", total)
+    if on_progress:
+        await on_progress(0, total)
+    summaries = await asyncio.gather(
+        *(summarize_chunk(i, chunk) for i, chunk in enumerate(chunks))
+    )
+
+    while len(summaries) > 1 and None not in summaries:
+        groups = _group_by_budget(summaries, LONGDOC_CHUNK_TOKENS)
+        summaries = await asyncio.gather(
+            *(run(REDUCE_PROMPT.format(summaries="\n\n".join(g))) for g in groups)
+        )
+
+    if None in summaries:
+        return None
+
+    summary_cache.set(doc_key, summaries[0])
+    return summaries[0]
+
+
+async def process_tts(text: str) -> bytes | None:
     """
-    Convert text to speech and return the path to the MP3 audio file.
+    Convert text to speech and return the MP3 audio bytes.
 
     Args:
         text (str): The input text to convert to speech.
 
     Returns:
-        str | None: Path to the generated audio file, or None on failure.
+        bytes | None: MP3 audio data, or None on failure.
     """
     preview = text[:30] + "..." if len(text) > 30 else text
     service_logger.info("Processing TTS for: '%s'", preview)
-    return generate_tts_audio(text)
+    with track_stage("tts"):
+        return await generate_tts_audio(text)
+
+
+def process_tts_progressive(text: str):
+    """
+    Convert text to speech chunk by chunk, for progressive delivery.
+
+    Args:
+        text (str): The input text to convert to speech.
+
+    Returns:
+        AsyncIterator[bytes | None]: MP3 audio of each chunk, in order;
+        None signals a failure.
+    """
+    preview = text[:30] + "..." if len(text) > 30 else text
+    service_logger.info("Processing progressive TTS for: '%s'", preview)
+    return iter_tts_audio(text)
 
 
 async def fetch_weather(city: str, date=None) -> str:
@@ -55,7 +189,9 @@ async def fetch_weather(city: str, date=None) -> str:
         str: Formatted weather information, or an error message.
     """
     service_logger.info("Fetching weather for city='%s', date='%s'", city, date)
-    return await weather_service(city, date)
+    record_weather_request(city, date)
+    with track_stage("weather"):
+        return await weather_service(city, date)
 
 
 async def fetch_wikipedia(term: str) -> str:
@@ -69,4 +205,6 @@ async def fetch_wikipedia(term: str) -> str:
         str: Summary or error message from Wikipedia.
     """
     service_logger.info("Searching Wikipedia for term='%s'", term)
-    return await wikipedia_service(term)
+    record_wiki_request(term)
+    with track_stage("wiki"):
+        return await wikipedia_service(term)
@@ -0,0 +1,189 @@
+# services/cache_warmer.py
+
+"""
+Background warming of the weather and Wikipedia caches.
+The most requested cities and terms are learned from live traffic and
+refreshed shortly before their cache entries expire, within a small upstream
+budget and only while no live request is being served.
+"""
+
+import math
+import time
+import asyncio
+
+from collections import Counter
+from datetime import datetime
+
+from services.geocoding import find_location, normalize_name
+from services.weather import (
+    current_cache,
+    forecast_cache,
+    get_current_data,
+    get_forecast_data,
+    weather_lang,
+)
+from services.wikipedia import normalize_title, fresh_for, search_wikipedia, wiki_lang
+from utils.logger import service_logger, error_logger
+from utils.memory import register_size
+from utils.config import (
+    CACHE_WARM_INTERVAL,
+    CACHE_WARM_TOP_N,
+    CACHE_WARM_MIN_REQUESTS,
+    CACHE_WARM_MARGIN,
+    CACHE_WARM_MAX_PER_MINUTE,
+    CACHE_WARM_QUIET,
+    CACHE_WARM_DECAY_INTERVAL,
+)
+
+
+class RequestHistory:
+    """
+    Decaying request counters per kind ("weather_current", "weather_forecast",
+    "wiki"), used to pick the keys worth keeping warm.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.last_request = 0.0
+        self.last_decay = time.monotonic()
+
+    def record(self, kind: str, key: tuple):
+        """
+        Count a live request.
+
+        Args:
+            kind (str): Request kind.
+            key (tuple): (normalized city name or search term, language).
+        """
+        self.counters.setdefault(kind, Counter())[key] += 1
+        self.last_request = time.monotonic()
+
+    def top(self, kind: str, n: int = CACHE_WARM_TOP_N) -> list[tuple]:
+        """Return the n most requested keys of a kind with enough requests."""
+        counter = self.counters.get(kind, Counter())
+        return [
+            key
+            for key, count in counter.most_common(n)
+            if count >= CACHE_WARM_MIN_REQUESTS
+        ]
+
+    def idle_for(self) -> float:
+        """Return the seconds elapsed since the last live request."""
+        return time.monotonic() - self.last_request
+
+    def decay(self):
+        """Halve every counter once per CACHE_WARM_DECAY_INTERVAL, dropping zeros."""
+        if time.monotonic() - self.last_decay < CACHE_WARM_DECAY_INTERVAL:
+            return
+        self.last_decay = time.monotonic()
+        for kind, counter in self.counters.items():
+            self.counters[kind] = Counter(
+                {key: count // 2 for key, count in counter.items() if count // 2}
+            )
+
+
+request_history = RequestHistory()
+register_size(
+    "warm_request_keys",
+    lambda: sum(len(c) for c in request_history.counters.values()),
+)
+
+
+def record_weather_request(city: str, date=None):
+    """Record a weather lookup for cache warming."""
+    # Same split as get_weather: today is served from the current conditions
+    current = date is None or date == datetime.now().date()
+    kind = "weather_current" if current else "weather_forecast"
+    request_history.record(kind, (normalize_name(city), weather_lang()))
+
+
+def record_wiki_request(term: str):
+    """Record a Wikipedia lookup for cache warming."""
+    request_history.record("wiki", (normalize_title(term), wiki_lang()))
+
+
+class CacheWarmer:
+    """
+    Periodically refreshes hot cache entries that are missing or about to expire.
+    At most CACHE_WARM_MAX_PER_MINUTE upstream calls are made per minute.
+    """
+
+    def __init__(self, history: RequestHistory):
+        self.history = history
+        self.spacing = 60 / CACHE_WARM_MAX_PER_MINUTE
+        self.last_call = 0.0
+        self.refreshed = 0
+        # Hot wiki keys found missing; not re-queried once their negative
+        # entry expires, only a live request that finds the page clears them
+        self.missing_wiki = set()
+
+    def needs_refresh(self, expires_in) -> bool:
+        return expires_in is None or expires_in < CACHE_WARM_MARGIN
+
+    async def wait_for_budget(self):
+        """Wait for the rate budget and for a pause in live traffic."""
+        delay = self.last_call + self.spacing - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        while self.history.idle_for() < CACHE_WARM_QUIET:
+            await asyncio.sleep(CACHE_WARM_QUIET)
+        self.last_call = time.monotonic()
+
+    def pending(self) -> list:
+        """Return (label, refresh coroutine factory) for every key to warm."""
+        jobs = []
+        for kind, cache, fetch in (
+            ("weather_current", current_cache, get_current_data),
+            ("weather_forecast", forecast_cache, get_forecast_data),
+        ):
+            for city, lang in self.history.top(kind):
+                location = find_location(city)
+                if not location:
+                    continue
+                if self.needs_refresh(cache.expires_in((location["id"], lang))):
+                    jobs.append(
+                        (
+                            f"{kind}:{city}:{lang}",
+                            lambda f=fetch, l=location, g=lang: f(l, g, refresh=True),
+                        )
+                    )
+        top_wiki = self.history.top("wiki")
+        self.missing_wiki &= set(top_wiki)
+        for term, lang in top_wiki:
+            expires_in = fresh_for(term, lang)
+            if expires_in == math.inf:
+                self.missing_wiki.add((term, lang))
+                continue
+            if expires_in is None and (term, lang) in self.missing_wiki:
+                continue
+            self.missing_wiki.discard((term, lang))
+            if self.needs_refresh(expires_in):
+                jobs.append(
+                    (
+                        f"wiki:{term}:{lang}",
+                        lambda t=term, g=lang: search_wikipedia(t, g, refresh=True),
+                    )
+                )
+        return jobs
+
+    async def warm_once(self):
+        """Run one warming pass."""
+        self.history.decay()
+        for label, refresh in self.pending():
+            await self.wait_for_budget()
+            try:
+                await refresh()
+                self.refreshed += 1
+                service_logger.info("Cache warmed: %s", label)
+            except Exception as e:
+                error_logger.error("Cache warming failed for %s: %s", label, str(e))
+
+    async def run(self):
+        """Warm caches forever, every CACHE_WARM_INTERVAL seconds."""
+        service_logger.info("Cache warmer started")
+        while True:
+            await asyncio.sleep(CACHE_WARM_INTERVAL)
+            await self.warm_once()
+
+
+cache_warmer = CacheWarmer(request_history)
@@ -1,10 +1,19 @@
 # services/gemini.py
 
+import asyncio
 import json
 import google.generativeai as genai
 
 from utils.config import GEMINI_API_KEY, MODELS_FILE, DEFAULT_MODEL
 from utils.logger import service_logger, error_logger
+from utils.request_context import (
+    track_stage,
+    add_request_tokens,
+    set_request_outcome,
+    note_request,
+)
+from utils.metrics import observe_upstream
+from utils.tracing import set_span_attributes
 
 # --- Configure Gemini API ---
 genai.configure(api_key=GEMINI_API_KEY)
@@ -55,12 +64,13 @@ def change_model(name):
     return False
 
 
-def get_gemini_response(prompt):
+def get_gemini_response(prompt, images=None):
     """
     Generate response from Gemini API using current model.
 
     Args:
         prompt (str): The full prompt to send.
+        images (list[dict], optional): Inline image parts ({"mime_type", "data"}).
 
     Returns:
         str | None: The model's response or None on error.
@@ -69,12 +79,41 @@ def get_gemini_response(prompt):
 
     preview = prompt[:45] + " [...] " + prompt[-45:] if len(prompt) > 90 else prompt
     service_logger.info("Gemini prompt preview: %s", preview)
+    note_request(model=model_name, prompt_chars=len(prompt), images=len(images or []))
 
     try:
         model_instance = genai.GenerativeModel(model_name)
-        response = model_instance.generate_content(prompt)
+        contents = [prompt, *images] if images else prompt
+        with track_stage("llm"), observe_upstream("gemini"):
+            set_span_attributes(
+                model=model_name, prompt_chars=len(prompt), images=len(images or [])
+            )
+            response = model_instance.generate_content(contents)
+            usage = getattr(response, "usage_metadata", None)
+            if usage:
+                set_span_attributes(
+                    prompt_tokens=usage.prompt_token_count,
+                    output_tokens=usage.candidates_token_count,
+                )
+        if usage:
+            add_request_tokens(usage.prompt_token_count, usage.candidates_token_count)
         service_logger.info("Gemini response generated with model: %s", model_name)
         return response.text
     except Exception as e:
         error_logger.error("Gemini API error: %s", str(e))
+        set_request_outcome("llm_error", e)
         return None
+
+
+async def get_gemini_response_async(prompt, images=None):
+    """
+    Run get_gemini_response in a worker thread so the event loop stays responsive.
+
+    Args:
+        prompt (str): The full prompt to send.
+        images (list[dict], optional): Inline image parts.
+
+    Returns:
+        str | None: The model's response or None on error.
+    """
+    return await asyncio.to_thread(get_gemini_response, prompt, images)
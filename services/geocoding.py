@@ -0,0 +1,217 @@
+# services/geocoding.py
+
+"""
+Persistent geocoding index mapping city names and aliases to coordinates.
+Names are resolved through the OpenWeather geocoding endpoint on first use
+and stored in SQLite, so later lookups (and weather queries) use coordinates.
+"""
+
+import sqlite3
+import threading
+import unicodedata
+
+from utils.config import OPENWEATHER_API_KEY, GEOCODING_DB_FILE
+from utils.logger import service_logger, error_logger
+from services.http_client import get_http_session
+
+GEOCODING_URL = "https://api.openweathermap.org/geo/1.0/direct"
+
+# Local names stored as aliases besides the query and the canonical name
+ALIAS_LANGUAGES = ("it", "en")
+
+conn = sqlite3.connect(GEOCODING_DB_FILE, check_same_thread=False)
+db_lock = threading.Lock()
+
+
+def initialize_geocoding_db():
+    """
+    Create the geocoding tables if they do not exist.
+    """
+    with db_lock:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS locations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                country TEXT,
+                state TEXT,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                UNIQUE (lat, lon)
+            )"""
+        )
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS aliases (
+                alias TEXT PRIMARY KEY,
+                location_id INTEGER NOT NULL REFERENCES locations(id)
+            )"""
+        )
+        conn.commit()
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a place name for lookups: lower case, no accents, single spaces.
+
+    Args:
+        name (str): Raw user input or place name.
+
+    Returns:
+        str: Normalized name (e.g. "  Forlì " -> "forli").
+    """
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.split())
+
+
+def _row_to_location(row):
+    return {
+        "id": row[0],
+        "name": row[1],
+        "country": row[2],
+        "state": row[3],
+        "lat": row[4],
+        "lon": row[5],
+    }
+
+
+def find_location(city: str):
+    """
+    Look up a city in the local index only.
+
+    Args:
+        city (str): City name or alias.
+
+    Returns:
+        dict | None: Location (id, name, country, state, lat, lon), or None.
+    """
+    with db_lock:
+        row = conn.execute(
+            """SELECT l.id, l.name, l.country, l.state, l.lat, l.lon
+               FROM aliases a JOIN locations l ON a.location_id = l.id
+               WHERE a.alias = ?""",
+            (normalize_name(city),),
+        ).fetchone()
+    return _row_to_location(row) if row else None
+
+
+def save_location(query: str, result: dict) -> dict:
+    """
+    Store a geocoding result and its aliases.
+
+    Args:
+        query (str): The user query that produced the result.
+        result (dict): One item of the OpenWeather geocoding response.
+
+    Returns:
+        dict: The stored location.
+    """
+    name = result["name"]
+    country = result.get("country")
+    lat, lon = round(result["lat"], 4), round(result["lon"], 4)
+    local_names = result.get("local_names") or {}
+
+    aliases = {normalize_name(query), normalize_name(name)}
+    if country:
+        aliases.add(normalize_name(f"{name}, {country}"))
+    for lang in ALIAS_LANGUAGES:
+        if local_names.get(lang):
+            aliases.add(normalize_name(local_names[lang]))
+
+    with db_lock:
+        conn.execute(
+            """INSERT OR IGNORE INTO locations (name, country, state, lat, lon)
+               VALUES (?, ?, ?, ?, ?)""",
+            (name, country, result.get("state"), lat, lon),
+        )
+        location_id = conn.execute(
+            "SELECT id FROM locations WHERE lat = ? AND lon = ?", (lat, lon)
+        ).fetchone()[0]
+        conn.executemany(
+            "INSERT OR REPLACE INTO aliases (alias, location_id) VALUES (?, ?)",
+            [(alias, location_id) for alias in aliases if alias],
+        )
+        conn.commit()
+
+    return {
+        "id": location_id,
+        "name": name,
+        "country": country,
+        "state": result.get("state"),
+        "lat": lat,
+        "lon": lon,
+    }
+
+
+async def resolve_city(city: str):
+    """
+    Resolve a city name to coordinates, using the local index first and the
+    OpenWeather geocoding endpoint on a miss.
+
+    Args:
+        city (str): City name as typed by the user.
+
+    Returns:
+        dict | None: Location (id, name, country, state, lat, lon), or None
+        if the city is unknown or the lookup failed.
+    """
+    location = find_location(city)
+    if location:
+        return location
+
+    params = {"q": city.strip(), "limit": 1, "appid": OPENWEATHER_API_KEY}
+    try:
+        async with get_http_session().get(GEOCODING_URL, params=params) as response:
+            if response.status != 200:
+                text = await response.text()
+                error_logger.error(
+                    "Geocoding API error [%s]: %s", response.status, text
+                )
+                return None
+            results = await response.json()
+    except Exception as e:
+        error_logger.error("Geocoding fetch error: %s", str(e))
+        return None
+
+    if not results:
+        service_logger.warning("Geocoding: no match for '%s'", city)
+        return None
+
+    location = save_location(city, results[0])
+    service_logger.info(
+        "Geocoded '%s' -> %s, %s (%s, %s)",
+        city,
+        location["name"],
+        location["country"],
+        location["lat"],
+        location["lon"],
+    )
+    return location
+
+
+def suggest_cities(prefix: str, limit: int = 10) -> list[str]:
+    """
+    Suggest known cities whose name or alias starts with the given prefix
+    (at the beginning of any word).
+
+    Args:
+        prefix (str): Partial city name.
+        limit (int): Maximum number of suggestions.
+
+    Returns:
+        list[str]: Labels such as "Roma, IT", usable as city input.
+    """
+    normalized = normalize_name(prefix)
+    escaped = normalized.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    with db_lock:
+        rows = conn.execute(
+            """SELECT DISTINCT l.name, l.country
+               FROM aliases a JOIN locations l ON a.location_id = l.id
+               WHERE a.alias LIKE ? ESCAPE '\\' OR a.alias LIKE ? ESCAPE '\\'
+               ORDER BY l.name
+               LIMIT ?""",
+            (f"{escaped}%", f"% {escaped}%", limit),
+        ).fetchall()
+    return [f"{name}, {country}" if country else name for name, country in rows]
+
+
+initialize_geocoding_db()
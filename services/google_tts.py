@@ -1,44 +1,209 @@
 # services/google_tts.py
 
-import tempfile
-import os
+import asyncio
+import hashlib
+import io
+import threading
+import gtts
 
 from gtts import gTTS
 
+from utils.cache import DiskLRUCache
+from utils.text import split_sentences
 from utils.logger import service_logger, error_logger
-from utils.config import DEFAULT_TTS_LANG
+from utils.metrics import observe_upstream
+from utils.config import (
+    DEFAULT_TTS_LANG,
+    TTS_TIMEOUT,
+    TTS_CACHE_DIR,
+    TTS_CACHE_MAX_BYTES,
+    TTS_CACHE_MEMORY_BYTES,
+    TTS_CHUNK_CHARS,
+    TTS_MAX_CONCURRENCY,
+)
 
+# Part of the cache key: upgrading gTTS invalidates previously cached audio
+TTS_ENGINE = f"gtts-{gtts.__version__}"
 
-def generate_tts_audio(text, language=DEFAULT_TTS_LANG):
+tts_cache = DiskLRUCache(
+    "tts_audio", TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, TTS_CACHE_MEMORY_BYTES
+)
+
+# Bounds concurrent gTTS syntheses across all requests. The asyncio semaphore
+# queues chunks without tying up worker threads; the thread-side slot is held
+# by the synthesis itself, so a worker outliving its timeout still counts.
+tts_semaphore = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+tts_slots = threading.BoundedSemaphore(TTS_MAX_CONCURRENCY)
+
+
+def tts_cache_key(text, language) -> str:
     """
-    Generate an MP3 audio file from text using Google Text-to-Speech (gTTS).
+    Build the cache key for a synthesis: (normalized text, language, engine version).
+
+    Args:
+        text (str): Text to synthesize.
+        language (str): TTS language.
+
+    Returns:
+        str: Hex digest usable as a file name.
+    """
+    normalized = " ".join(text.split())
+    raw = f"{TTS_ENGINE}\n{language}\n{normalized}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def synthesize_tts(text, language=DEFAULT_TTS_LANG) -> bytes:
+    """
+    Render text to MP3 bytes with gTTS, entirely in memory.
+    Blocking: meant to run in a worker thread.
+
+    Args:
+        text (str): The text to convert to audio.
+        language (str): The language for TTS.
+
+    Returns:
+        bytes: MP3 audio data.
+    """
+    buffer = io.BytesIO()
+    tts = gTTS(text=text, lang=language, timeout=TTS_TIMEOUT)
+    with observe_upstream("gtts"):
+        tts.write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def _synthesize_in_slot(text, language, abandoned: threading.Event):
+    """
+    Run synthesize_tts while holding a thread-side slot. Skipped if the
+    caller gave up (timeout or cancellation) before a slot was free.
+
+    Returns:
+        bytes | None: MP3 audio data, or None if abandoned.
+
+    Raises:
+        TimeoutError: If no slot frees up within TTS_TIMEOUT.
+    """
+    if not tts_slots.acquire(timeout=TTS_TIMEOUT):
+        raise TimeoutError("no free TTS slot")
+    try:
+        if abandoned.is_set():
+            return None
+        return synthesize_tts(text, language)
+    finally:
+        tts_slots.release()
+
+
+async def synthesize_chunk(text, language=DEFAULT_TTS_LANG):
+    """
+    Synthesize a single chunk of text, using the audio cache.
+
+    Args:
+        text (str): Chunk text (at most TTS_CHUNK_CHARS characters).
+        language (str): The language for TTS.
+
+    Returns:
+        bytes | None: MP3 audio data, or None on error.
+    """
+    key = tts_cache_key(text, language)
+    audio = tts_cache.get_hot(key) or await asyncio.to_thread(tts_cache.get, key)
+    if audio:
+        service_logger.info("TTS audio served from cache (%d bytes)", len(audio))
+        return audio
+
+    abandoned = threading.Event()
+    try:
+        async with tts_semaphore:
+            audio = await asyncio.wait_for(
+                asyncio.to_thread(_synthesize_in_slot, text, language, abandoned),
+                TTS_TIMEOUT,
+            )
+    except asyncio.TimeoutError:
+        error_logger.error("TTS generation timed out after %s seconds", TTS_TIMEOUT)
+        return None
+    except Exception as e:
+        error_logger.error("TTS generation failed: %s", str(e))
+        return None
+    finally:
+        abandoned.set()
+
+    if not audio:
+        error_logger.error("TTS generated empty audio")
+        return None
+
+    service_logger.info("TTS audio generated in memory (%d bytes)", len(audio))
+    await asyncio.to_thread(tts_cache.set, key, audio)
+    return audio
+
+
+def start_chunk_tasks(text, language):
+    """
+    Split text at sentence boundaries and start synthesizing every chunk.
+
+    Returns:
+        list[asyncio.Task]: One task per chunk, in text order.
+    """
+    chunks = split_sentences(text, TTS_CHUNK_CHARS)
+    if len(chunks) > 1:
+        service_logger.info("TTS split into %d chunks", len(chunks))
+    return [asyncio.create_task(synthesize_chunk(c, language)) for c in chunks]
+
+
+async def generate_tts_audio(text, language=DEFAULT_TTS_LANG):
+    """
+    Generate MP3 audio from text using Google Text-to-Speech (gTTS).
+
+    Long texts are split at sentence boundaries and the chunks are synthesized
+    concurrently (each one cached on its own), then joined into one MP3 stream.
+    Synthesis runs in worker threads with a timeout, keeping the event loop free.
 
     Args:
         text (str): The text to convert to audio.
         language (str): The language for TTS. Default from config.
 
     Returns:
-        str | None: Path to the generated audio file, or None on error.
+        bytes | None: MP3 audio data, or None on error.
     """
     if not text.strip():
         error_logger.warning("TTS skipped: empty or whitespace-only text.")
         return None
 
+    tasks = start_chunk_tasks(text, language)
     try:
-        # Use only the temporary filename without opening the file
-        tmp_path = tempfile.mktemp(suffix=".mp3")
+        for next_done in asyncio.as_completed(tasks):
+            if await next_done is None:
+                return None
+        # MP3 frames are self-delimiting: concatenated chunks play as one stream
+        return b"".join(task.result() for task in tasks)
+    finally:
+        # Stop the remaining chunks after a failure (or cancellation)
+        for task in tasks:
+            task.cancel()
 
-        tts = gTTS(text=text, lang=language)
-        tts.save(tmp_path)
 
-        filesize = os.path.getsize(tmp_path)
-        service_logger.info("TTS file generated: %s (%d bytes)", tmp_path, filesize)
+async def iter_tts_audio(text, language=DEFAULT_TTS_LANG):
+    """
+    Progressive variant of generate_tts_audio: yield each chunk's audio, in
+    order, as soon as it is ready, while later chunks are still synthesizing.
 
-        if filesize == 0:
-            error_logger.error("TTS generated an empty file: %s", tmp_path)
-            return None
+    Args:
+        text (str): The text to convert to audio.
+        language (str): The language for TTS.
 
-        return tmp_path
-    except Exception as e:
-        error_logger.error("TTS generation failed: %s", str(e))
-        return None
+    Yields:
+        bytes | None: MP3 audio of the next chunk; None signals a failure,
+        after which nothing else is yielded.
+    """
+    if not text.strip():
+        error_logger.warning("TTS skipped: empty or whitespace-only text.")
+        yield None
+        return
+
+    tasks = start_chunk_tasks(text, language)
+    try:
+        for task in tasks:
+            audio = await task
+            yield audio
+            if audio is None:
+                return
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,156 @@
+# services/http_client.py
+
+"""
+Application-scoped aiohttp session shared by every outbound HTTP service.
+Created at bot startup and closed on shutdown, it keeps connections alive
+between requests (no new connector, DNS lookup or TLS handshake each time).
+"""
+
+import re
+import time
+import aiohttp
+
+from utils.logger import service_logger
+from utils.metrics import record_upstream_call
+from utils.tracing import start_span, SPAN_KIND_CLIENT
+from utils.config import (
+    HTTP_TOTAL_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+)
+
+_session = None
+
+# Host suffix -> service name used in metrics
+UPSTREAM_SERVICES = {
+    "openweathermap.org": "openweather",
+    "wikipedia.org": "wikipedia",
+    "discordapp.com": "discord_cdn",
+    "discordapp.net": "discord_cdn",
+    "telegram.org": "telegram",
+}
+
+
+# Bot API paths embed the bot token (/bot<token>/..., /file/bot<token>/...)
+_TOKEN_PATH = re.compile(r"/bot[^/\s]+")
+
+
+def redact(text: str) -> str:
+    """Hide bot tokens in a URL, path or error message before it is stored."""
+    return _TOKEN_PATH.sub("/bot***", text)
+
+
+def upstream_service(host: str) -> str:
+    """Return the metrics service name for a host."""
+    for suffix, service in UPSTREAM_SERVICES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return service
+    return "other"
+
+
+async def _on_request_start(session, trace_context, params):
+    trace_context.start = time.perf_counter()
+    service = upstream_service(params.url.host or "")
+    path = params.url.path
+    trace_context.span = start_span(
+        f"HTTP {params.method}",
+        SPAN_KIND_CLIENT,
+        service=service,
+        http_method=params.method,
+        server_address=params.url.host,
+        url_path=redact(path) if service == "telegram" else path,
+    )
+
+
+async def _on_request_end(session, trace_context, params):
+    status = params.response.status
+    if trace_context.span:
+        trace_context.span.set_attribute("http_status_code", status)
+        if status >= 500:
+            trace_context.span.set_error(f"HTTP {status}")
+        trace_context.span.end()
+    record_upstream_call(
+        upstream_service(params.url.host or ""),
+        time.perf_counter() - trace_context.start,
+        # 404 is an answer (e.g. no such page), not a failure
+        ok=status < 400 or status == 404,
+    )
+
+
+async def _on_request_exception(session, trace_context, params):
+    if trace_context.span:
+        trace_context.span.set_error(redact(str(params.exception)))
+        trace_context.span.end()
+    record_upstream_call(
+        upstream_service(params.url.host or ""),
+        time.perf_counter() - trace_context.start,
+        ok=False,
+    )
+
+
+def _create_trace_config() -> aiohttp.TraceConfig:
+    """Record latency and errors of every request made with the shared session."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_exception)
+    return trace_config
+
+
+def _create_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=HTTP_TOTAL_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        trace_configs=[_create_trace_config()],
+    )
+
+
+async def start_http_client():
+    """
+    Create the shared HTTP session. Should be called once at startup.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+        service_logger.info(
+            "HTTP client started (pool=%d, per host=%d)",
+            HTTP_POOL_LIMIT,
+            HTTP_LIMIT_PER_HOST,
+        )
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Return the shared HTTP session, creating it if the bot was started
+    without the launcher. Must be called from within the event loop.
+
+    Returns:
+        aiohttp.ClientSession: The shared session.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+
+async def close_http_client():
+    """
+    Close the shared HTTP session and its pooled connections.
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        service_logger.info("HTTP client closed")
+    _session = None
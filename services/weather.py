@@ -1,11 +1,118 @@
 # services/weather.py
 
-import aiohttp
-from datetime import datetime
+from array import array
+from datetime import datetime, timedelta, timezone
 
-from utils.config import OPENWEATHER_API_KEY, WEATHER_EMOJIS
-from utils.localization import translate
+from utils.config import (
+    OPENWEATHER_API_KEY,
+    WEATHER_EMOJIS,
+    WEATHER_LANG,
+    WEATHER_CURRENT_TTL,
+    WEATHER_FORECAST_TTL,
+    WEATHER_CACHE_SIZE,
+)
+from utils.cache import TTLCache
+from utils.localization import translate, get_current_lang
 from utils.logger import service_logger, error_logger
+from services.http_client import get_http_session
+from services.geocoding import resolve_city
+
+current_cache = TTLCache("weather_current", WEATHER_CURRENT_TTL, WEATHER_CACHE_SIZE)
+forecast_cache = TTLCache("weather_forecast", WEATHER_FORECAST_TTL, WEATHER_CACHE_SIZE)
+
+
+class ForecastIndex:
+    """
+    Compact, pre-parsed view of an OpenWeather 5-day / 3-hour forecast.
+    Entries are stored as parallel arrays and indexed by local date and hour
+    (using the city UTC offset), so per-date lookups do not re-parse the payload.
+    """
+
+    def __init__(self, data: dict):
+        city = data["city"]
+        self.country = city.get("country", "")
+        self.offset = city.get("timezone", 0)  # seconds from UTC
+        tz = timezone(timedelta(seconds=self.offset))
+
+        self.epochs = array("q")
+        self.temps = array("d")
+        self.humidity = array("B")
+        self.wind = array("d")
+        self.conditions = []
+        self.descriptions = []
+        self.slots = {}  # (date, hour) -> position
+        self.days = {}  # date -> [positions]
+
+        for entry in sorted(data["list"], key=lambda e: e["dt"]):
+            position = len(self.epochs)
+            local = datetime.fromtimestamp(entry["dt"], tz)
+            self.epochs.append(entry["dt"])
+            self.temps.append(entry["main"]["temp"])
+            self.humidity.append(entry["main"]["humidity"])
+            self.wind.append(entry["wind"]["speed"])
+            self.conditions.append(entry["weather"][0]["main"].lower())
+            self.descriptions.append(entry["weather"][0]["description"].capitalize())
+            self.slots[(local.date(), local.hour)] = position
+            self.days.setdefault(local.date(), []).append(position)
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def dates(self) -> list:
+        """Return the local dates covered by the forecast, in order."""
+        return list(self.days)
+
+    def entry(self, position: int) -> dict:
+        """Return the forecast slot at the given position as a dictionary."""
+        return {
+            "time": datetime.fromtimestamp(
+                self.epochs[position], timezone(timedelta(seconds=self.offset))
+            ),
+            "temp": self.temps[position],
+            "humidity": self.humidity[position],
+            "wind": self.wind[position],
+            "condition": self.conditions[position],
+            "description": self.descriptions[position],
+        }
+
+    def at(self, date, hour: int = 12):
+        """
+        Return the slot for a local date closest to the given hour.
+
+        Args:
+            date (datetime.date): Local date.
+            hour (int): Preferred local hour (default: noon).
+
+        Returns:
+            dict | None: Forecast slot, or None if the date is not covered.
+        """
+        position = self.slots.get((date, hour))
+        if position is None:
+            positions = self.days.get(date)
+            if not positions:
+                return None
+            position = min(
+                positions,
+                key=lambda p: abs((self.epochs[p] + self.offset) // 3600 % 24 - hour),
+            )
+        return self.entry(position)
+
+    def hourly(self, date) -> list[dict]:
+        """Return every slot of a local date, in chronological order."""
+        return [self.entry(p) for p in self.days.get(date, [])]
+
+    def temp_range(self, date):
+        """
+        Return the minimum and maximum temperature forecast for a local date.
+
+        Returns:
+            tuple[float, float] | None: (min, max), or None if the date is not covered.
+        """
+        positions = self.days.get(date)
+        if not positions:
+            return None
+        temps = [self.temps[p] for p in positions]
+        return min(temps), max(temps)
 
 
 async def fetch_weather_data(session, url):
@@ -33,20 +140,96 @@ async def fetch_weather_data(session, url):
 
 
 def format_weather_response(
-    temp, description, condition, humidity, wind, city, country, date=None
+    temp,
+    description,
+    condition,
+    humidity,
+    wind,
+    city,
+    country,
+    date=None,
+    temp_range=None,
 ):
     """
     Format weather data into a readable string with emojis and metrics.
     """
     emoji = WEATHER_EMOJIS.get(condition, "🌍")
     date_str = f" - {date.strftime('%d-%m-%Y')}" if date else ""
+    range_str = f" (⬇️ {temp_range[0]} / ⬆️ {temp_range[1]})" if temp_range else ""
     return (
         f"📍 {city.title()}, {country} {emoji}{date_str}\n"
-        f"🌡️ {temp} °C | {description}\n"
-        f"💧 Humidity: {humidity}% | 🌬️ Wind: {wind} m/s"
+        f"🌡️ {temp} °C{range_str} | {description}\n"
+        + translate("weather_details", humidity=humidity, wind=wind)
     )
 
 
+def weather_lang(lang=None) -> str:
+    """
+    Return the OpenWeather language for a request: the given one, else the
+    locale of the current server/chat, else WEATHER_LANG.
+    """
+    return lang or get_current_lang() or WEATHER_LANG
+
+
+async def get_current_data(location, lang=None, refresh=False):
+    """
+    Return current conditions for a location, from cache when still fresh.
+
+    Args:
+        location (dict): Resolved location (see services.geocoding).
+        lang (str, optional): Description language (see weather_lang).
+        refresh (bool): Bypass the cache and fetch from OpenWeather.
+
+    Returns:
+        dict | None: OpenWeather /weather payload, or None on error.
+    """
+    lang = weather_lang(lang)
+    key = (location["id"], lang)
+    data = None if refresh else current_cache.get(key)
+    if data is None:
+        url = (
+            f"https://api.openweathermap.org/data/2.5/weather"
+            f"?lat={location['lat']}&lon={location['lon']}"
+            f"&appid={OPENWEATHER_API_KEY}&units=metric&lang={lang}"
+        )
+        data = await fetch_weather_data(get_http_session(), url)
+        if data:
+            current_cache.set(key, data)
+            service_logger.info("Weather data fetched for: %s", location["name"])
+    return data
+
+
+async def get_forecast_data(location, lang=None, refresh=False):
+    """
+    Return the 5-day / 3-hour forecast for a location, from cache when still fresh.
+    The payload is parsed once into a ForecastIndex that answers every date
+    in its range.
+
+    Args:
+        location (dict): Resolved location (see services.geocoding).
+        lang (str, optional): Description language (see weather_lang).
+        refresh (bool): Bypass the cache and fetch from OpenWeather.
+
+    Returns:
+        ForecastIndex | None: Indexed forecast, or None on error.
+    """
+    lang = weather_lang(lang)
+    key = (location["id"], lang)
+    data = None if refresh else forecast_cache.get(key)
+    if data is None:
+        url = (
+            f"https://api.openweathermap.org/data/2.5/forecast"
+            f"?lat={location['lat']}&lon={location['lon']}"
+            f"&appid={OPENWEATHER_API_KEY}&units=metric&lang={lang}"
+        )
+        data = await fetch_weather_data(get_http_session(), url)
+        if data:
+            data = ForecastIndex(data)
+            forecast_cache.set(key, data)
+            service_logger.info("Weather forecast fetched for: %s", location["name"])
+    return data
+
+
 async def get_weather(city, date=None):
     """
     Get current weather or forecast for a given city and optional date.
@@ -59,60 +242,49 @@ async def get_weather(city, date=None):
         str: Weather report string, or error message on failure.
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            if date is None or date == datetime.now().date():
-                # Current weather
-                url = (
-                    f"https://api.openweathermap.org/data/2.5/weather?q={city}"
-                    f"&appid={OPENWEATHER_API_KEY}&units=metric&lang=it"
-                )
-                data = await fetch_weather_data(session, url)
-                if not data:
-                    return translate("weather_city_not_found")
-
-                service_logger.info("Weather data fetched for city: %s", city)
-                temp = data["main"]["temp"]
-                description = data["weather"][0]["description"].capitalize()
-                condition = data["weather"][0]["main"].lower()
-                humidity = data["main"]["humidity"]
-                wind = data["wind"]["speed"]
-                country = data["sys"]["country"]
-                return format_weather_response(
-                    temp, description, condition, humidity, wind, city, country
-                )
+        location = await resolve_city(city)
+        if not location:
+            return translate("weather_city_not_found")
+        city = location["name"]
 
-            else:
-                # Forecast
-                url = (
-                    f"http://api.openweathermap.org/data/2.5/forecast?q={city}"
-                    f"&appid={OPENWEATHER_API_KEY}&units=metric&lang=it"
-                )
-                data = await fetch_weather_data(session, url)
-                if not data:
-                    return translate("weather_city_not_found")
-
-                selected = None
-                for entry in data["list"]:
-                    dt_obj = datetime.strptime(entry["dt_txt"], "%Y-%m-%d %H:%M:%S")
-                    if dt_obj.date() == date and dt_obj.hour == 12:
-                        selected = entry
-                        break
-
-                if not selected:
-                    return translate(
-                        "weather_no_forecast", date=date.strftime("%d-%m-%Y")
-                    )
-
-                service_logger.info("Weather forecast fetched for %s (%s)", city, date)
-                temp = selected["main"]["temp"]
-                description = selected["weather"][0]["description"].capitalize()
-                condition = selected["weather"][0]["main"].lower()
-                humidity = selected["main"]["humidity"]
-                wind = selected["wind"]["speed"]
-                country = data["city"]["country"]
-                return format_weather_response(
-                    temp, description, condition, humidity, wind, city, country, date
-                )
+        if date is None or date == datetime.now().date():
+            # Current weather
+            data = await get_current_data(location)
+            if not data:
+                return translate("weather_city_not_found")
+
+            temp = data["main"]["temp"]
+            description = data["weather"][0]["description"].capitalize()
+            condition = data["weather"][0]["main"].lower()
+            humidity = data["main"]["humidity"]
+            wind = data["wind"]["speed"]
+            country = data["sys"]["country"]
+            return format_weather_response(
+                temp, description, condition, humidity, wind, city, country
+            )
+
+        else:
+            # Forecast
+            forecast = await get_forecast_data(location)
+            if not forecast:
+                return translate("weather_city_not_found")
+
+            selected = forecast.at(date)
+            if not selected:
+                return translate("weather_no_forecast", date=date.strftime("%d-%m-%Y"))
+
+            service_logger.info("Weather forecast selected for %s (%s)", city, date)
+            return format_weather_response(
+                selected["temp"],
+                selected["description"],
+                selected["condition"],
+                selected["humidity"],
+                selected["wind"],
+                city,
+                forecast.country,
+                date,
+                forecast.temp_range(date),
+            )
 
     except Exception as e:
         error_logger.error("Weather service error: %s", str(e))
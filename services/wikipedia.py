@@ -1,38 +1,310 @@
 # services/wikipedia.py
 
-import aiohttp
-from utils.localization import translate
+"""
+Wikipedia page summaries through the REST API.
+
+Terms are resolved to page titles with the opensearch endpoint; the exact
+title is tried at the same time, then the top candidates are fetched
+concurrently and the best match is kept. The term -> title mapping is cached.
+
+Summaries are cached with their ETag / Last-Modified validators: within
+WIKI_CACHE_TTL they are served locally, afterwards they are revalidated with a
+conditional GET, so unchanged pages cost a bodyless 304 response.
+Missing pages are cached for WIKI_NEGATIVE_TTL.
+"""
+
+import math
+import time
+import asyncio
+
+from difflib import SequenceMatcher
+from urllib.parse import quote
+
+from utils.cache import TTLCache
+from utils.request_context import record_cache_decision
+from utils.config import (
+    WIKI_LANG,
+    WIKI_CACHE_TTL,
+    WIKI_CACHE_MAX_AGE,
+    WIKI_NEGATIVE_TTL,
+    WIKI_CACHE_SIZE,
+    WIKI_SEARCH_CANDIDATES,
+    WIKI_TITLE_TTL,
+)
+from utils.localization import translate, get_current_lang
 from utils.logger import service_logger, error_logger
+from services.http_client import get_http_session
+
+# (lang, title) -> {"result", "type", "etag", "last_modified", "checked_at"}
+summary_cache = TTLCache("wiki_summaries", WIKI_CACHE_MAX_AGE, WIKI_CACHE_SIZE)
+# (lang, lower-case term) -> resolved title ("" when the search found nothing)
+title_cache = TTLCache("wiki_titles", WIKI_TITLE_TTL, WIKI_CACHE_SIZE)
+
+
+def wiki_lang(lang=None) -> str:
+    """
+    Return the Wikipedia edition for a request: the given one, else the
+    locale of the current server/chat, else WIKI_LANG.
+    """
+    return lang or get_current_lang() or WIKI_LANG
+
+
+def normalize_title(term: str) -> str:
+    """
+    Normalize a search term the way Wikipedia normalizes titles:
+    single spaces and an upper-case first letter.
+
+    Args:
+        term (str): The search term.
+
+    Returns:
+        str: Normalized title (e.g. " alan  turing" -> "Alan turing").
+    """
+    title = " ".join(term.split())
+    return title[:1].upper() + title[1:]
+
+
+def cache_key(term: str, lang: str = WIKI_LANG) -> tuple:
+    """Return the summary cache key for a page title."""
+    return lang, normalize_title(term)
+
+
+def title_key(term: str, lang: str = WIKI_LANG) -> tuple:
+    """Return the title cache key for a search term."""
+    return lang, normalize_title(term).lower()
+
+
+def fresh_for(term: str, lang: str = WIKI_LANG):
+    """
+    Return the seconds before the cached summary for a term needs revalidation.
+
+    Args:
+        term (str): The search term.
+        lang (str): Wikipedia language edition.
+
+    Returns:
+        float | None: Seconds left (0 if stale), math.inf if the term is
+        cached as missing (not worth warming), or None if not cached.
+    """
+    title = title_cache.peek(title_key(term, lang))
+    if title == "":
+        return math.inf
+    entry = summary_cache.peek(cache_key(title or term, lang))
+    if entry is None:
+        return None
+    if entry["result"] is None:
+        return math.inf
+    return max(0.0, entry["checked_at"] + WIKI_CACHE_TTL - time.monotonic())
+
+
+def _parse_summary(data: dict) -> tuple:
+    title = data.get("title", "Unknown")
+    extract = data.get("extract", "No description found.")
+    link = data.get("content_urls", {}).get("desktop", {}).get("page", "")
+    image = data.get("thumbnail", {}).get("source")
+    return title, extract, link, image
+
+
+async def fetch_summary(title: str, lang: str = WIKI_LANG, refresh=False):
+    """
+    Fetch the summary of an exact page title, using and maintaining the cache.
+
+    Args:
+        title (str): Page title.
+        lang (str): Wikipedia language edition.
+        refresh (bool): Revalidate the cached summary even if still fresh.
+
+    Returns:
+        dict | None: Cache entry ("result" is the (title, extract, link, image)
+        tuple, "type" the page type), or None if the page does not exist.
+
+    Raises:
+        Exception: Network errors, when no cached copy can be served instead.
+    """
+    key = cache_key(title, lang)
+    entry = summary_cache.get(key)
+    if entry:
+        if entry["result"] is None:
+            return None
+        if entry["checked_at"] + WIKI_CACHE_TTL > time.monotonic() and not refresh:
+            return entry
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    path = quote(key[1].replace(" ", "_"), safe="")
+    url = f"https://{lang}.wikipedia.org/api/rest_v1/page/summary/{path}"
+    try:
+        async with get_http_session().get(url, headers=headers) as response:
+            if response.status == 304 and entry:
+                record_cache_decision("wiki_summaries", "not_modified")
+                entry["checked_at"] = time.monotonic()
+                summary_cache.set(key, entry)
+                service_logger.info("Wikipedia entry not modified: %s", key[1])
+                return entry
+            if response.status == 200:
+                data = await response.json()
+                entry = {
+                    "result": _parse_summary(data),
+                    "type": data.get("type"),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "checked_at": time.monotonic(),
+                }
+                summary_cache.set(key, entry)
+                return entry
+            if response.status == 404:
+                summary_cache.set(
+                    key,
+                    {"result": None, "checked_at": time.monotonic()},
+                    ttl=WIKI_NEGATIVE_TTL,
+                )
+            elif entry and entry["result"]:
+                record_cache_decision("wiki_summaries", "stale")
+                error_logger.error(
+                    "Wikipedia revalidation failed [%s], serving stale: %s",
+                    response.status,
+                    key[1],
+                )
+                return entry
+            service_logger.warning(
+                "Wikipedia summary unavailable: %s [%s]", key[1], response.status
+            )
+            return None
+    except Exception as e:
+        if entry and entry["result"]:
+            record_cache_decision("wiki_summaries", "stale")
+            error_logger.error("Wikipedia revalidation error, serving stale: %s", e)
+            return entry
+        raise
 
 
-async def search_wikipedia(term):
+async def search_titles(term: str, lang: str = WIKI_LANG) -> list[str]:
     """
-    Search for a summary of a term on Italian Wikipedia.
+    Return the best matching page titles for a term (opensearch endpoint).
 
     Args:
         term (str): The search term.
+        lang (str): Wikipedia language edition.
+
+    Returns:
+        list[str]: Up to WIKI_SEARCH_CANDIDATES titles, best first.
+    """
+    params = {
+        "action": "opensearch",
+        "search": term,
+        "limit": WIKI_SEARCH_CANDIDATES,
+        "namespace": 0,
+        "format": "json",
+    }
+    url = f"https://{lang}.wikipedia.org/w/api.php"
+    async with get_http_session().get(url, params=params) as response:
+        if response.status != 200:
+            service_logger.warning("Wikipedia search error [%s]", response.status)
+            return []
+        data = await response.json()
+    return data[1] if len(data) > 1 else []
+
+
+def _match_score(term: str, rank: int, entry: dict) -> float:
+    """Score a candidate: title similarity, search rank, no disambiguation pages."""
+    title = entry["result"][0]
+    score = SequenceMatcher(None, term.lower(), title.lower()).ratio()
+    score -= 0.1 * rank
+    if normalize_title(term) == title:
+        score += 1
+    if entry.get("type") == "disambiguation":
+        score -= 2
+    return score
+
+
+async def resolve_term(term: str, lang: str = WIKI_LANG):
+    """
+    Resolve a free-form term to the summary of the best matching page.
+    The exact title and the search run concurrently; the remaining candidates
+    are then fetched concurrently. A failed search leaves the exact title as
+    the only candidate.
+
+    Args:
+        term (str): The search term.
+        lang (str): Wikipedia language edition.
+
+    Returns:
+        dict | None: Summary cache entry of the best page, or None.
+
+    Raises:
+        Exception: Network errors of the exact fetch, when no other candidate
+            could be fetched.
+    """
+    exact, titles = await asyncio.gather(
+        fetch_summary(term, lang), search_titles(term, lang), return_exceptions=True
+    )
+    exact_error = None
+    if isinstance(exact, BaseException):
+        exact_error, exact = exact, None
+    if isinstance(titles, BaseException):
+        if exact_error:
+            raise exact_error
+        error_logger.error("Wikipedia search error for '%s': %s", term, titles)
+        titles = []
+    if exact and exact.get("type") != "disambiguation":
+        title_cache.set(title_key(term, lang), exact["result"][0])
+        return exact
+
+    others = [t for t in titles if normalize_title(t) != normalize_title(term)]
+    fetched = await asyncio.gather(
+        *(fetch_summary(t, lang) for t in others), return_exceptions=True
+    )
+    candidates = [(0, exact)] if exact else []
+    candidates += [
+        (rank, entry)
+        for rank, entry in enumerate(fetched, 1)
+        if entry and not isinstance(entry, BaseException)
+    ]
+    if not candidates:
+        if exact_error:
+            raise exact_error
+        title_cache.set(title_key(term, lang), "", ttl=WIKI_NEGATIVE_TTL)
+        return None
+
+    best = max(candidates, key=lambda c: _match_score(term, c[0], c[1]))[1]
+    title_cache.set(title_key(term, lang), best["result"][0])
+    service_logger.info("Wikipedia term '%s' resolved to: %s", term, best["result"][0])
+    return best
+
+
+async def search_wikipedia(term, lang=None, refresh=False):
+    """
+    Search for a summary of a term on Wikipedia.
+
+    Args:
+        term (str): The search term (need not be an exact page title).
+        lang (str, optional): Wikipedia edition; defaults to the locale of the
+            current server/chat, then WIKI_LANG.
+        refresh (bool): Revalidate the cached summary even if still fresh.
 
     Returns:
         tuple: (title, extract, link, image_url) if found,
                or (None, error_message, "", None) on failure.
     """
-    url = f"https://it.wikipedia.org/api/rest_v1/page/summary/{term.replace(' ', '_')}"
+    lang = wiki_lang(lang)
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    title = data.get("title", "Unknown")
-                    extract = data.get("extract", "No description found.")
-                    link = (
-                        data.get("content_urls", {}).get("desktop", {}).get("page", "")
-                    )
-                    image = data.get("thumbnail", {}).get("source")
-                    service_logger.info("Wikipedia entry found: %s", title)
-                    return title, extract, link, image
-                else:
-                    service_logger.warning("Wikipedia no entry for term: %s", term)
-                    return None, translate("wiki_no_entry"), "", None
+        title = title_cache.get(title_key(term, lang))
+        if title == "":
+            entry = None
+        elif title:
+            entry = await fetch_summary(title, lang, refresh=refresh)
+        else:
+            entry = await resolve_term(term, lang)
+
+        if entry is None:
+            service_logger.warning("Wikipedia no entry for term: %s", term)
+            return None, translate("wiki_no_entry"), "", None
+        service_logger.info("Wikipedia entry found: %s", entry["result"][0])
+        return entry["result"]
     except Exception as e:
         error_logger.error("Wikipedia search error: %s", str(e))
         return None, translate("wiki_error", error=e), "", None
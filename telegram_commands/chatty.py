@@ -1,17 +1,58 @@
 # telegram_commands/chatty.py
 
+import asyncio
+
 from telegram.ext import CommandHandler, MessageHandler, filters
 from core.handler import process_text
 
 from utils.context import get_context_prompt
 from utils.localization import translate
 from utils.logger import bot_logger
-from utils.generic import read_file_content, resolve_server_name
+from utils.memory import register_size
+from utils.request_context import track_stage, set_request_outcome
+from utils.generic import resolve_server_name, track_telegram_request
+from utils.attachments import (
+    read_attachments,
+    TelegramAttachment,
+    SUPPORTED_EXTENSIONS,
+)
 from utils.db_utils import log_to_sqlite
+from utils.config import TELEGRAM_MEDIA_GROUP_WAIT
 
 BOT_COMMAND = "chatty"
 
+# media_group_id -> messages received so far for that album
+pending_media_groups = {}
+register_size("telegram_media_groups", lambda: len(pending_media_groups))
+
+
+async def collect_media_group(message):
+    """
+    Collect all the messages of a Telegram media group (album).
+
+    Telegram delivers each document of an album as a separate update sharing
+    the same media_group_id. The first update waits briefly and returns the
+    whole group; the following ones return None.
+
+    Args:
+        message (Message): Incoming Telegram message.
+
+    Returns:
+        list | None: The grouped messages, or None if another update owns the group.
+    """
+    if not message.media_group_id:
+        return [message]
+
+    group = pending_media_groups.setdefault(message.media_group_id, [])
+    group.append(message)
+    if len(group) > 1:
+        return None
+
+    await asyncio.sleep(TELEGRAM_MEDIA_GROUP_WAIT)
+    return pending_media_groups.pop(message.media_group_id)
+
 
+@track_telegram_request("chatty")
 async def chatty(update, context):
     """
     Handle the /chatty command: sends the user's prompt to Gemini, including attachments if present.
@@ -23,37 +64,47 @@ async def chatty(update, context):
     user = update.effective_user
     chat = update.effective_chat
 
-    # Raccogli testo principale
-    text_raw = update.message.text or ""
+    messages = await collect_media_group(update.message)
+    if messages is None:
+        set_request_outcome("media_group_member")
+        return
+
+    # Raccogli testo principale (comando o didascalia)
+    text_raw = next((m.text or m.caption for m in messages if m.text or m.caption), "")
     prompt_text = text_raw.replace("/" + BOT_COMMAND, "", 1).strip()
 
+    # Photos are only for /chatty: uncaptioned album photos (private chats)
+    # need the command on another message of the same group
+    if any(m.photo for m in messages) and not text_raw.startswith("/" + BOT_COMMAND):
+        set_request_outcome("ignored")
+        return
+
     # Raccogli eventuali allegati
+    attachments = []
+    for m in messages:
+        if m.document:
+            attachments.append(TelegramAttachment(m.document))
+        elif m.photo:
+            # Largest available resolution; Telegram photos are always JPEG
+            attachments.append(TelegramAttachment(m.photo[-1], "photo.jpg"))
+    if not prompt_text:
+        # Without a prompt, stray files of unsupported types are ignored silently
+        supported = [
+            a for a in attachments if a.filename.lower().endswith(SUPPORTED_EXTENSIONS)
+        ]
+        if attachments and not supported:
+            set_request_outcome("ignored")
+            return
+        attachments = supported
     attachment_texts = []
-
-    if update.message.document:
-        document = update.message.document
-        if document.file_name.lower().endswith(
-            (".txt", ".csv", ".html", ".pdf", ".docx", ".odt")
-        ):
-            file = await document.get_file()
-            file_bytes = await file.download_as_bytearray()
-
-            # Telegram non ha Attachment come Discord, usiamo workaround
-            class FakeAttachment:
-                def __init__(self, filename, file_bytes):
-                    self.filename = filename
-                    self._file_bytes = file_bytes
-                    self.size = len(file_bytes)
-
-                async def read(self):
-                    return self._file_bytes
-
-            fake = FakeAttachment(document.file_name, file_bytes)
-            result = await read_file_content(fake)
-            if not result.startswith(("❌", "⚠️")):
-                attachment_texts.append(result)
-
-    if not prompt_text and not attachment_texts:
+    images = []
+    if attachments:
+        with track_stage("extract"):
+            attachment_texts, images, status_lines = await read_attachments(attachments)
+        if status_lines:
+            await update.message.reply_text("\n".join(status_lines))
+
+    if not prompt_text and not attachment_texts and not images:
         await update.message.reply_text(translate("generic_no_text"))
         return
 
@@ -67,7 +118,8 @@ async def chatty(update, context):
         )
 
     server_name = resolve_server_name(user, chat)
-    context_prompt = get_context_prompt(server_name)
+    with track_stage("context"):
+        context_prompt = get_context_prompt(server_name)
 
     if context_prompt:
         full_prompt = context_prompt.strip() + "\n\n" + final_prompt
@@ -76,19 +128,26 @@ async def chatty(update, context):
         full_prompt = final_prompt
 
     bot_logger.info("Gemini prompt from %s: %s", user.full_name, prompt_text[:100])
-    response = process_text(full_prompt)
+    response = process_text(full_prompt, images=images)
 
-    log_to_sqlite(user, chat, final_prompt, response)
+    with track_stage("db"):
+        log_to_sqlite(user, chat, final_prompt, response)
 
-    if response:
-        await update.message.reply_text(response)
-    else:
-        await update.message.reply_text(translate("gemini_error"))
+    with track_stage("send"):
+        if response:
+            await update.message.reply_text(response)
+        else:
+            await update.message.reply_text(translate("gemini_error"))
 
 
 def register(app):
     app.add_handler(
         MessageHandler(
-            filters.Document.ALL | (filters.TEXT & filters.Command(BOT_COMMAND)), chatty
+            filters.Document.ALL
+            | (filters.PHOTO & filters.CaptionRegex(rf"^/{BOT_COMMAND}\b"))
+            | (filters.PHOTO & filters.ChatType.PRIVATE & ~filters.CAPTION)
+            | (filters.TEXT & filters.Command(BOT_COMMAND)),
+            chatty,
+            block=False,  # media groups wait for their siblings without blocking
         )
     )
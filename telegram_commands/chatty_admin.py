@@ -1,21 +1,48 @@
 # telegram_commands/chatty_admin.py
 
+import io
 import os
 import sqlite3
 
+from datetime import datetime
+
 from telegram.ext import CommandHandler
 
-from utils.localization import translate
-from utils.context import set_context_file, reset_context, get_server_context
+from utils.localization import translate, translate_many, available_languages
+from utils.context import (
+    set_context_file,
+    reset_context,
+    get_server_context,
+    set_locale,
+    reset_locale,
+)
 from services.gemini import get_supported_models, get_current_model, change_model
-from utils.config import PROMPT_DIR, DB_FILE
+from utils.config import (
+    PROMPT_DIR,
+    DB_FILE,
+    PERF_WINDOW,
+    PERF_MAX_WINDOW,
+    PROFILER_SECONDS,
+    PROFILER_MAX_SECONDS,
+)
 from utils.logger import bot_logger, error_logger
-from utils.generic import resolve_server_name, check_telegram_admin, check_telegram_dm
+from utils.generic import (
+    resolve_server_name,
+    check_telegram_admin,
+    check_telegram_dm,
+    track_telegram_request,
+)
+from utils.cache import format_cache_stats
+from utils.perf import format_perf_report
+from utils.profiler import run_profile, is_profiling
+from utils.loop_watchdog import loop_watchdog
+from utils.memory import run_memory_action, MEMORY_ACTIONS
 
 
 # --- CONTEXT: Set ---
 
 
+@track_telegram_request("chatty_admin_context")
 async def chatty_admin_context(update, context):
     """
     Reset the context prompt associated with the current Telegram group or user.
@@ -47,6 +74,7 @@ async def chatty_admin_context(update, context):
 
 
 # --- CONTEXT: Reset ---
+@track_telegram_request("chatty_admin_context_reset")
 async def chatty_admin_context_reset(update, context):
     """
     Reset the context prompt for the current Telegram group or user.
@@ -66,6 +94,7 @@ async def chatty_admin_context_reset(update, context):
 
 
 # --- CONTEXT: List files ---
+@track_telegram_request("chatty_admin_contexts")
 async def chatty_admin_contexts(update, context):
     """
     List all available context files from the prompts/ directory.
@@ -89,7 +118,53 @@ async def chatty_admin_contexts(update, context):
         await update.message.reply_text(translate("context_files_error"))
 
 
+# --- LOCALE: Set ---
+@track_telegram_request("chatty_admin_locale")
+async def chatty_admin_locale(update, context):
+    """
+    Set the locale used for messages, Wikipedia and weather in this chat.
+
+    Args:
+        update (Update): Telegram update object containing the language code.
+        context (ContextTypes.DEFAULT_TYPE): Context from the handler.
+    """
+    if not await check_telegram_admin(update):
+        return
+    langs = ", ".join(available_languages())
+    if not context.args:
+        await update.message.reply_text(translate("invalid_locale", langs=langs))
+        return
+
+    lang = context.args[0].strip().lower()
+    server_name = resolve_server_name(update.effective_user, update.effective_chat)
+
+    if set_locale(server_name, lang):
+        bot_logger.info("Locale set to '%s' for %s", lang, server_name)
+        await update.message.reply_text(translate("locale_set", lang=lang, locale=lang))
+    else:
+        await update.message.reply_text(translate("invalid_locale", langs=langs))
+
+
+# --- LOCALE: Reset ---
+@track_telegram_request("chatty_admin_locale_reset")
+async def chatty_admin_locale_reset(update, context):
+    """
+    Reset the locale of the current Telegram group or user to the defaults.
+
+    Args:
+        update (Update): Telegram update object.
+        context (ContextTypes.DEFAULT_TYPE): Context from the handler.
+    """
+    if not await check_telegram_admin(update):
+        return
+    server_name = resolve_server_name(update.effective_user, update.effective_chat)
+    reset_locale(server_name)
+    bot_logger.info("Locale reset for %s", server_name)
+    await update.message.reply_text(translate("locale_reset"))
+
+
 # --- MODELS: List ---
+@track_telegram_request("chatty_admin_models")
 async def chatty_admin_models(update, context):
     """
     List all available Gemini models and highlight the currently selected one.
@@ -112,6 +187,7 @@ async def chatty_admin_models(update, context):
 
 
 # --- MODELS: Switch ---
+@track_telegram_request("chatty_admin_model")
 async def chatty_admin_model(update, context):
     """
     Change the active Gemini model used by the bot.
@@ -146,6 +222,7 @@ async def chatty_admin_model(update, context):
 
 
 # --- STATS ---
+@track_telegram_request("chatty_admin_stats")
 async def chatty_admin_stats(update, context):
     """
     Show basic statistics including total prompts and unique users.
@@ -161,14 +238,162 @@ async def chatty_admin_stats(update, context):
     ctx = get_server_context()
     model = get_current_model()
 
-    info = translate("embed_stats_desc", model=model)
+    info, context_title, cache_title = translate_many(
+        [
+            ("embed_stats_desc", {"model": model}),
+            "embed_context_title",
+            "embed_cache_title",
+        ]
+    )
     context_info = "\n".join([f"{k}: {v}" for k, v in ctx.items()]) or "None"
 
-    msg = f"{info}\n\n{translate('embed_context_title')}\n{context_info}"
+    msg = (
+        f"{info}\n\n{context_title}\n{context_info}"
+        f"\n\n{cache_title}\n{format_cache_stats()}"
+    )
     await update.message.reply_text(msg)
 
 
+# --- PERFORMANCE ---
+@track_telegram_request("chatty_admin_perf")
+async def chatty_admin_perf(update, context):
+    """
+    Show latency percentiles per command and service, request and error
+    rates, cache hit ratios, queue depths and memory over a sliding window.
+
+    Args:
+        update (Update): Telegram update object, optionally with the window in minutes.
+        context (ContextTypes.DEFAULT_TYPE): Context from the handler.
+    """
+    if not await check_telegram_dm(update):
+        return
+    if not await check_telegram_admin(update):
+        return
+    minutes = PERF_WINDOW // 60
+    if context.args and context.args[0].isdigit():
+        minutes = min(max(int(context.args[0]), 1), PERF_MAX_WINDOW // 60)
+
+    report = format_perf_report(minutes * 60)
+    await update.message.reply_text(report[:4096])  # Telegram max message size
+    bot_logger.info("Performance report sent to %s", update.effective_user.full_name)
+
+
+# --- PROFILER ---
+@track_telegram_request("chatty_admin_profile")
+async def chatty_admin_profile(update, context):
+    """
+    Sample the stacks of every thread for some seconds and send back a
+    collapsed-stack file and a top-functions summary.
+
+    Args:
+        update (Update): Telegram update object, optionally with the duration in seconds.
+        context (ContextTypes.DEFAULT_TYPE): Context from the handler.
+    """
+    if not await check_telegram_dm(update):
+        return
+    if not await check_telegram_admin(update):
+        return
+    if is_profiling():
+        await update.message.reply_text(translate("profile_busy"))
+        return
+
+    seconds = PROFILER_SECONDS
+    if context.args and context.args[0].isdigit():
+        seconds = min(max(int(context.args[0]), 1), PROFILER_MAX_SECONDS)
+
+    await update.message.reply_text(translate("profile_started", seconds=seconds))
+    result = await run_profile(seconds)
+    if result is None:
+        await update.message.reply_text(translate("profile_busy"))
+        return
+
+    stamp = result.created_at.strftime("%Y%m%d-%H%M%S")
+    await update.message.reply_document(
+        document=io.BytesIO(result.collapsed().encode("utf-8")),
+        filename=f"profile-{stamp}.collapsed.txt",
+        caption=translate("profile_done", seconds=seconds, samples=result.samples),
+    )
+    await update.message.reply_document(
+        document=io.BytesIO(result.summary().encode("utf-8")),
+        filename=f"profile-{stamp}-top.txt",
+    )
+    bot_logger.info(
+        "Profile of %ss sent to %s", seconds, update.effective_user.full_name
+    )
+
+
+# --- EVENT LOOP ---
+@track_telegram_request("chatty_admin_loop")
+async def chatty_admin_loop(update, context):
+    """
+    Show the event loop lag and stall count; "on"/"off" switches asyncio
+    debug mode (slow callback reports).
+
+    Args:
+        update (Update): Telegram update object, optionally with "on" or "off".
+        context (ContextTypes.DEFAULT_TYPE): Context from the handler.
+    """
+    if not await check_telegram_dm(update):
+        return
+    if not await check_telegram_admin(update):
+        return
+    if context.args and context.args[0].lower() in ("on", "off"):
+        enabled = context.args[0].lower() == "on"
+        loop_watchdog.set_debug(enabled)
+        bot_logger.info(
+            "asyncio debug set to %s by %s", enabled, update.effective_user.full_name
+        )
+
+    await update.message.reply_text(
+        translate(
+            "loop_status",
+            lag=f"{loop_watchdog.last_lag * 1000:.1f}",
+            stalls=loop_watchdog.stalls,
+            debug="ON" if loop_watchdog.is_debug() else "OFF",
+        )
+    )
+
+
+# --- MEMORY ---
+@track_telegram_request("chatty_admin_memory")
+async def chatty_admin_memory(update, context):
+    """
+    Start or stop tracemalloc, reset the baseline, or send the top growing
+    allocation sites and the sizes of known caches.
+
+    Args:
+        update (Update): Telegram update object, optionally with the action
+            (diff, start, baseline, stop).
+        context (ContextTypes.DEFAULT_TYPE): Context from the handler.
+    """
+    if not await check_telegram_dm(update):
+        return
+    if not await check_telegram_admin(update):
+        return
+    action = context.args[0].lower() if context.args else "diff"
+    if action not in MEMORY_ACTIONS:
+        await update.message.reply_text(
+            translate("memory_invalid_action", actions=", ".join(MEMORY_ACTIONS))
+        )
+        return
+
+    key, report = await run_memory_action(action)
+    if report is None:
+        await update.message.reply_text(translate(key))
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        await update.message.reply_document(
+            document=io.BytesIO(report.encode("utf-8")),
+            filename=f"memory-{stamp}.txt",
+            caption=translate(key),
+        )
+    bot_logger.info(
+        "Memory action '%s' requested by %s", action, update.effective_user.full_name
+    )
+
+
 # --- ACTIVITY (last 7 days) ---
+@track_telegram_request("chatty_admin_activity")
 async def chatty_admin_activity(update, context):
     """
     Display daily prompt activity for the last 7 days.
@@ -213,6 +438,7 @@ async def chatty_admin_activity(update, context):
 
 
 # --- LASTLOGS ---
+@track_telegram_request("chatty_admin_lastlogs")
 async def chatty_admin_lastlogs(update, context):
     """
     Show the last 10 recorded conversations from the SQLite database.
@@ -258,6 +484,7 @@ async def chatty_admin_lastlogs(update, context):
     await update.message.reply_text(logs[:4096])  # Telegram max message size
 
 
+@track_telegram_request("chatty_admin_help")
 async def chatty_admin_help(update, context):
     """
     Display a list of all available administrative commands with descriptions.
@@ -281,9 +508,23 @@ def register(app):
         CommandHandler("chatty_admin_context_reset", chatty_admin_context_reset)
     )
     app.add_handler(CommandHandler("chatty_admin_contexts", chatty_admin_contexts))
+    app.add_handler(CommandHandler("chatty_admin_locale", chatty_admin_locale))
+    app.add_handler(
+        CommandHandler("chatty_admin_locale_reset", chatty_admin_locale_reset)
+    )
     app.add_handler(CommandHandler("chatty_admin_models", chatty_admin_models))
     app.add_handler(CommandHandler("chatty_admin_model", chatty_admin_model))
     app.add_handler(CommandHandler("chatty_admin_stats", chatty_admin_stats))
+    app.add_handler(CommandHandler("chatty_admin_perf", chatty_admin_perf))
+    app.add_handler(
+        CommandHandler(
+            "chatty_admin_profile",
+            chatty_admin_profile,
+            block=False,  # the profile must not stall the other updates
+        )
+    )
+    app.add_handler(CommandHandler("chatty_admin_loop", chatty_admin_loop))
+    app.add_handler(CommandHandler("chatty_admin_memory", chatty_admin_memory))
     app.add_handler(CommandHandler("chatty_admin_activity", chatty_admin_activity))
     app.add_handler(CommandHandler("chatty_admin_lastlogs", chatty_admin_lastlogs))
     app.add_handler(CommandHandler("chatty_admin_help", chatty_admin_help))
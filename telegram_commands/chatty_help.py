@@ -3,9 +3,11 @@
 from telegram.ext import CommandHandler
 
 from utils.localization import translate
+from utils.generic import track_telegram_request
 from utils.logger import bot_logger
 
 
+@track_telegram_request("chatty_help")
 async def chatty_help(update, context):
     """
     Handle the /chatty_help command: sends a list of available bot commands and their descriptions.
@@ -7,11 +7,12 @@ from telegram.ext import CommandHandler
 from utils.localization import translate
 from utils.logger import bot_logger
 from utils.context import get_context_prompt
-from utils.generic import resolve_server_name
+from utils.generic import resolve_server_name, track_telegram_request
 from services.gemini import get_current_model
 from utils.config import BOT_START_TIME
 
 
+@track_telegram_request("chatty_info")
 async def chatty_info(update, context):
     """
     Handle the /chatty_info command: sends bot uptime, model and version info.
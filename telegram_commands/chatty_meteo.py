@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 
 from core.handler import fetch_weather
 from utils.localization import translate
+from utils.generic import track_telegram_request
 from utils.logger import bot_logger
 
 
@@ -54,6 +55,7 @@ def extract_city_and_date(args):
     return " ".join(args), "oggi"  # default if no date found
 
 
+@track_telegram_request("chatty_meteo")
 async def chatty_meteo(update, context):
     """
     Handle the /chatty_meteo command: provides weather forecast for a city and optional date.
@@ -1,18 +1,17 @@
 # telegram_commands/chatty_tts.py
 
-import os
-
 from telegram.ext import CommandHandler
 from telegram import InputFile
 
 from core.handler import process_tts
+from utils.generic import track_telegram_request
 from utils.logger import bot_logger, error_logger
 from utils.localization import translate
-from utils.generic import safe_delete
 
 BOT_COMMAND = "chatty_tts"
 
 
+@track_telegram_request("chatty_tts")
 async def chatty_tts(update, context):
     """
     Handle the /chatty_tts command: converts the given text to audio using Google TTS and sends it back.
@@ -35,16 +34,12 @@ async def chatty_tts(update, context):
         text,
     )
 
-    audio_file = process_tts(text)
+    audio = await process_tts(text)
 
-    if audio_file and os.path.isfile(audio_file):
+    if audio:
         try:
-
-            with open(audio_file, "rb") as f:
-                audio_input = InputFile(f, filename="tts.mp3")
-                await update.message.reply_audio(audio=audio_input)
-
-            safe_delete(audio_file)
+            audio_input = InputFile(audio, filename="tts.mp3")
+            await update.message.reply_audio(audio=audio_input)
             bot_logger.info("TTS sent successfully for: %s", text)
         except Exception as e:
             error_logger.error("Telegram failed to send TTS: %s", str(e))
@@ -4,12 +4,14 @@ from telegram.helpers import escape_markdown
 from telegram.ext import CommandHandler
 
 from utils.localization import translate
+from utils.generic import track_telegram_request
 from utils.logger import bot_logger
 from core.handler import fetch_wikipedia
 
 BOT_COMMAND = "chatty_wiki"
 
 
+@track_telegram_request("chatty_wiki")
 async def chatty_wiki(update, context):
     """
     Handle the /chatty_wiki command: searches Wikipedia for the provided term and sends the summary.
@@ -0,0 +1,398 @@
+# utils/attachments.py
+
+"""
+Attachment ingestion for Discord and Telegram.
+Downloads are checked against the declared size first and then streamed
+into a bounded buffer, so a single request can never hold more than the
+configured ceiling in memory.
+"""
+
+import io
+import asyncio
+import fitz  # PyMuPDF
+
+from bs4 import BeautifulSoup
+from docx import Document
+from odf.opendocument import load
+from odf.text import P
+
+from utils.localization import translate
+from utils.logger import bot_logger
+from utils.tracing import span
+from utils.request_context import note_request_attachment
+from utils.images import prepare_image
+from services.http_client import get_http_session
+from utils.config import (
+    MAX_TXT_CSV_HTML_SIZE,
+    MAX_PDF_SIZE,
+    MAX_OFFICE_DOC_SIZE,
+    MAX_IMAGE_SIZE,
+    MAX_ATTACHMENT_BYTES,
+    ATTACHMENT_CHUNK_SIZE,
+    MAX_DOC_LENGTH,
+    MAX_ATTACHMENTS,
+    ATTACHMENT_TOKEN_BUDGET,
+    CHARS_PER_TOKEN,
+)
+
+# extension -> (max size in bytes, translation key used when exceeded)
+SIZE_LIMITS = {
+    ".txt": (MAX_TXT_CSV_HTML_SIZE, "file_too_large_small"),
+    ".csv": (MAX_TXT_CSV_HTML_SIZE, "file_too_large_small"),
+    ".html": (MAX_TXT_CSV_HTML_SIZE, "file_too_large_small"),
+    ".pdf": (MAX_PDF_SIZE, "file_too_large_pdf"),
+    ".docx": (MAX_OFFICE_DOC_SIZE, "file_too_large_doc"),
+    ".odt": (MAX_OFFICE_DOC_SIZE, "file_too_large_doc"),
+    ".jpg": (MAX_IMAGE_SIZE, "file_too_large_image"),
+    ".jpeg": (MAX_IMAGE_SIZE, "file_too_large_image"),
+    ".png": (MAX_IMAGE_SIZE, "file_too_large_image"),
+    ".webp": (MAX_IMAGE_SIZE, "file_too_large_image"),
+}
+
+SUPPORTED_EXTENSIONS = tuple(SIZE_LIMITS)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+class AttachmentTooLarge(Exception):
+    """Raised when an attachment exceeds its size limit."""
+
+    def __init__(self, filename, limit):
+        super().__init__(f"{filename} exceeds {limit} bytes")
+        self.filename = filename
+        self.limit = limit
+
+
+class AttachmentDownloadError(Exception):
+    """
+    Raised when an attachment cannot be downloaded. The message carries only
+    the HTTP status, never the URL: Telegram file URLs embed the bot token.
+    """
+
+    def __init__(self, filename, status=None):
+        detail = f"HTTP {status}" if status else "network error"
+        super().__init__(f"download of {filename} failed ({detail})")
+        self.filename = filename
+        self.status = status
+
+
+class BoundedBuffer(io.BytesIO):
+    """
+    In-memory buffer that refuses to grow past a fixed number of bytes.
+    """
+
+    def __init__(self, limit: int, filename: str = ""):
+        super().__init__()
+        self.limit = limit
+        self.filename = filename
+
+    def write(self, data):
+        if self.tell() + len(data) > self.limit:
+            raise AttachmentTooLarge(self.filename, self.limit)
+        return super().write(data)
+
+
+class TelegramAttachment:
+    """
+    Adapter exposing a Telegram document or photo with the same attributes
+    (filename, size) used for Discord attachments.
+    The file is only downloaded when explicitly requested.
+    """
+
+    def __init__(self, document, filename: str = None):
+        self.document = document
+        self.filename = filename or getattr(document, "file_name", None) or "document"
+        self.size = document.file_size or 0
+
+    async def download_into(self, buffer: BoundedBuffer):
+        """
+        Download the document into the given bounded buffer.
+
+        Args:
+            buffer (BoundedBuffer): Destination buffer.
+        """
+        file = await self.document.get_file()
+        if file.file_path and file.file_path.startswith("http"):
+            await stream_url_into(file.file_path, buffer)
+        else:
+            # Local Bot API server: the file is already on disk
+            await file.download_to_memory(out=buffer)
+
+
+async def stream_url_into(url: str, buffer: BoundedBuffer):
+    """
+    Stream the body of an HTTP resource into a bounded buffer.
+
+    Args:
+        url (str): Resource URL.
+        buffer (BoundedBuffer): Destination buffer.
+
+    Raises:
+        AttachmentTooLarge: If the body exceeds the buffer limit.
+    """
+    async with get_http_session().get(url) as response:
+        response.raise_for_status()
+        if (response.content_length or 0) > buffer.limit:
+            raise AttachmentTooLarge(buffer.filename, buffer.limit)
+        async for chunk in response.content.iter_chunked(ATTACHMENT_CHUNK_SIZE):
+            buffer.write(chunk)
+
+
+async def read_attachment_bytes(attachment, limit: int) -> bytes:
+    """
+    Download an attachment, enforcing the size limit before and during the transfer.
+
+    Args:
+        attachment: A discord.Attachment or TelegramAttachment.
+        limit (int): Maximum number of bytes to accept.
+
+    Returns:
+        bytes: The attachment content.
+
+    Raises:
+        AttachmentTooLarge: If the declared or actual size exceeds the limit.
+        AttachmentDownloadError: If the download fails.
+    """
+    if (attachment.size or 0) > limit:
+        raise AttachmentTooLarge(attachment.filename, limit)
+
+    buffer = BoundedBuffer(limit, attachment.filename)
+    try:
+        if isinstance(attachment, TelegramAttachment):
+            await attachment.download_into(buffer)
+        else:
+            await stream_url_into(attachment.url, buffer)
+    except AttachmentTooLarge:
+        raise
+    except Exception as e:
+        # The exception text may contain the file URL (and the bot token)
+        status = getattr(e, "status", None)
+        bot_logger.warning(
+            "Download of '%s' failed: %s %s",
+            attachment.filename,
+            type(e).__name__,
+            status or "",
+        )
+        raise AttachmentDownloadError(attachment.filename, status) from None
+    return buffer.getvalue()
+
+
+def extract_text(filename: str, file_bytes: bytes) -> str:
+    """
+    Convert the raw bytes of a supported document to plain text.
+
+    Args:
+        filename (str): Lower-cased file name, used to detect the format.
+        file_bytes (bytes): File content.
+
+    Returns:
+        str: Extracted text.
+    """
+    if filename.endswith(".html"):
+        return BeautifulSoup(file_bytes, "html.parser").get_text()
+    if filename.endswith((".txt", ".csv")):
+        return file_bytes.decode("utf-8", errors="ignore")
+    if filename.endswith(".pdf"):
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            return "".join([page.get_text() for page in doc])
+    if filename.endswith(".docx"):
+        doc = Document(io.BytesIO(file_bytes))
+        return "\n".join([p.text for p in doc.paragraphs])
+    if filename.endswith(".odt"):
+        odt_doc = load(io.BytesIO(file_bytes))
+        return "\n".join([str(p) for p in odt_doc.getElementsByType(P)])
+    raise ValueError(f"Unsupported format: {filename}")
+
+
+def size_limit_for(filename: str):
+    """
+    Return the size limit and the related error key for a file name.
+
+    Args:
+        filename (str): Lower-cased file name.
+
+    Returns:
+        tuple | None: (max bytes, translation key), or None if unsupported.
+    """
+    ext = "." + filename.rsplit(".", 1)[-1] if "." in filename else ""
+    return SIZE_LIMITS.get(ext)
+
+
+async def read_file_content(attachment, max_chars: int = MAX_DOC_LENGTH, limit=None):
+    """
+    Read the content of a supported file attachment.
+
+    Supports TXT, CSV, HTML, PDF, DOCX, ODT formats with size limits.
+    Converts content to plain text; parsing runs in a worker thread.
+
+    Args:
+        attachment: A discord.Attachment or TelegramAttachment.
+        max_chars (int): Truncation length for PDF, DOCX and ODT text.
+        limit (int, optional): Byte limit overriding the per-format one.
+
+    Returns:
+        tuple[bool, str]: (True, extracted text) or (False, error message).
+    """
+    filename = attachment.filename.lower()
+    size_limit = size_limit_for(filename)
+    if size_limit is None:
+        return False, translate("file_format_not_supported", filename=filename)
+
+    format_limit, too_large_key = size_limit
+    if limit is None:
+        limit = min(format_limit, MAX_ATTACHMENT_BYTES)
+    try:
+        with span("read_file_content", filename=filename) as current:
+            file_bytes = await read_attachment_bytes(attachment, limit)
+            note_request_attachment(filename, len(file_bytes))
+            text = await asyncio.to_thread(extract_text, filename, file_bytes)
+            if current:
+                current.set_attribute("bytes", len(file_bytes))
+                current.set_attribute("chars", len(text))
+    except AttachmentTooLarge:
+        bot_logger.warning(
+            "Attachment '%s' rejected (declared size: %s bytes)",
+            filename,
+            attachment.size,
+        )
+        return False, translate(too_large_key, filename=filename)
+    except Exception as e:
+        return False, translate("file_reading_error", error=e)
+
+    if filename.endswith((".txt", ".csv", ".html")):
+        return True, text
+    return True, text[:max_chars]
+
+
+async def read_image(attachment, limit=None):
+    """
+    Download an image attachment and prepare it as a Gemini inline part.
+    Decoding and downscaling run in a worker thread.
+
+    Args:
+        attachment: A discord.Attachment or TelegramAttachment.
+        limit (int, optional): Byte limit overriding MAX_IMAGE_SIZE.
+
+    Returns:
+        tuple[bool, dict | str]: (True, inline image part) or
+        (False, error message).
+    """
+    filename = attachment.filename.lower()
+    if limit is None:
+        limit = min(MAX_IMAGE_SIZE, MAX_ATTACHMENT_BYTES)
+    try:
+        with span("read_image", filename=filename) as current:
+            file_bytes = await read_attachment_bytes(attachment, limit)
+            note_request_attachment(filename, len(file_bytes))
+            if current:
+                current.set_attribute("bytes", len(file_bytes))
+            return True, await asyncio.to_thread(prepare_image, file_bytes)
+    except AttachmentTooLarge:
+        bot_logger.warning(
+            "Image '%s' rejected (declared size: %s bytes)", filename, attachment.size
+        )
+        return False, translate("file_too_large_image", filename=filename)
+    except Exception as e:
+        return False, translate("file_reading_error", error=e)
+
+
+class AttachmentBudget:
+    """
+    Byte budget shared by all attachments of a single request.
+    Each download reserves its worst-case size up front, so the sum of the
+    buffers alive at the same time never exceeds the budget.
+    """
+
+    def __init__(self, max_bytes: int = MAX_ATTACHMENT_BYTES):
+        self.remaining = max_bytes
+
+    def reserve(self, attachment):
+        """
+        Reserve bytes for an attachment.
+
+        Args:
+            attachment: A discord.Attachment or TelegramAttachment.
+
+        Returns:
+            int | None: Reserved byte limit, or None if the budget is exhausted
+            or the declared size is already over its format limit.
+        """
+        size_limit = size_limit_for(attachment.filename.lower())
+        if size_limit is None:
+            return 0
+        needed = attachment.size or size_limit[0]
+        if needed > size_limit[0]:
+            # Let the reader report the format-specific error
+            return 0
+        if needed > self.remaining:
+            return None
+        self.remaining -= needed
+        return needed
+
+
+async def read_attachments(
+    attachments, max_chars=MAX_DOC_LENGTH, max_tokens=ATTACHMENT_TOKEN_BUDGET
+):
+    """
+    Download and extract several attachments concurrently under a shared budget.
+
+    Byte reservations are taken in the given order before any download starts;
+    the token budget is then spent in the same order, truncating the last texts.
+
+    Args:
+        attachments (list): discord.Attachment or TelegramAttachment objects.
+        max_chars (int): Per-document truncation for PDF, DOCX and ODT.
+        max_tokens (int | None): Total token budget for all texts, None for no limit.
+
+    Returns:
+        tuple[list[str], list[dict], list[str]]: (extracted texts, inline image
+        parts, per-file status lines for files that were skipped or truncated).
+    """
+    status_lines = []
+    budget = AttachmentBudget()
+    jobs = []
+
+    for index, attachment in enumerate(attachments):
+        if index >= MAX_ATTACHMENTS:
+            status_lines.append(
+                translate("attachment_skipped_limit", filename=attachment.filename)
+            )
+            continue
+        reserved = budget.reserve(attachment)
+        if reserved is None:
+            status_lines.append(
+                translate("attachment_skipped_budget", filename=attachment.filename)
+            )
+            continue
+        if attachment.filename.lower().endswith(IMAGE_EXTENSIONS):
+            job = read_image(attachment, reserved or None)
+        else:
+            job = read_file_content(attachment, max_chars, reserved or None)
+        jobs.append((attachment, job))
+
+    results = await asyncio.gather(*(job for _, job in jobs))
+
+    texts = []
+    images = []
+    remaining_chars = max_tokens * CHARS_PER_TOKEN if max_tokens else None
+    for (attachment, _), (ok, result) in zip(jobs, results):
+        if not ok:
+            status_lines.append(result)
+            continue
+        if isinstance(result, dict):
+            images.append(result)
+            continue
+        if remaining_chars is not None:
+            if remaining_chars <= 0:
+                status_lines.append(
+                    translate("attachment_skipped_budget", filename=attachment.filename)
+                )
+                continue
+            if len(result) > remaining_chars:
+                result = result[:remaining_chars]
+                status_lines.append(
+                    translate("attachment_truncated", filename=attachment.filename)
+                )
+            remaining_chars -= len(result)
+        texts.append(result)
+
+    return texts, images, status_lines
@@ -0,0 +1,348 @@
+# utils/cache.py
+
+"""
+In-process caches shared by services.
+Every cache registers itself by name so statistics can be inspected at runtime.
+"""
+
+import os
+import time
+import threading
+
+from collections import OrderedDict
+
+cache_registry = {}
+
+# Called with (cache name, "hit" | "miss" | ...) on every lookup; set by
+# utils.request_context to record the cache decisions of each request
+_lookup_observer = None
+
+
+def register_cache(name: str, cache):
+    """
+    Register a cache instance under a unique name.
+
+    Args:
+        name (str): Cache name.
+        cache: Any object exposing a stats() method.
+    """
+    cache_registry[name] = cache
+
+
+def set_lookup_observer(observer):
+    """
+    Set the function notified of every cache lookup.
+
+    Args:
+        observer (Callable[[str, str], None] | None): Receives the cache name
+            and the lookup result.
+    """
+    global _lookup_observer
+    _lookup_observer = observer
+
+
+def _observe(name: str, result: str):
+    if _lookup_observer is not None:
+        _lookup_observer(name, result)
+
+
+def get_cache_stats() -> dict:
+    """
+    Return statistics for every registered cache.
+
+    Returns:
+        dict: Mapping of cache name -> stats dictionary.
+    """
+    return {name: cache.stats() for name, cache in cache_registry.items()}
+
+
+def format_cache_stats() -> str:
+    """
+    Render cache statistics as one line per cache, for admin commands.
+
+    Returns:
+        str: Human-readable summary, or "None" if no cache is registered.
+    """
+    lines = []
+    for name, stats in get_cache_stats().items():
+        line = f"{name}: {stats['items']} items, {stats['hit_ratio']:.0%} hits"
+        if "bytes" in stats:
+            line += f", {stats['bytes'] / 1024:.0f} KB"
+        lines.append(line)
+    return "\n".join(lines) or "None"
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with a fixed number of entries.
+    """
+
+    def __init__(self, name: str, max_items: int = 128):
+        self.name = name
+        self.max_items = max_items
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        register_cache(name, self)
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                _observe(self.name, "hit")
+                return self._data[key]
+            self.misses += 1
+            _observe(self.name, "miss")
+            return default
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if needed."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "items": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class TTLCache:
+    """
+    Thread-safe cache whose entries expire after a time-to-live,
+    bounded to max_items with least-recently-used eviction.
+    """
+
+    def __init__(self, name: str, ttl: float, max_items: int = 256):
+        self.name = name
+        self.ttl = ttl
+        self.max_items = max_items
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        register_cache(name, self)
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                _observe(self.name, "hit")
+                return entry[1]
+            if entry:
+                del self._data[key]
+            self.misses += 1
+            _observe(self.name, "expired" if entry else "miss")
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        """Store a value for ttl seconds (defaults to the cache TTL)."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def peek(self, key, default=None):
+        """
+        Return the cached value for key without refreshing its recency.
+        Does not count as a lookup.
+        """
+        entry = self._data.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return default
+
+    def expires_in(self, key):
+        """
+        Return the seconds left before key expires, or None if it is not cached.
+        Does not count as a lookup.
+        """
+        entry = self._data.get(key)
+        if not entry:
+            return None
+        return max(0.0, entry[0] - time.monotonic())
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "items": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class DiskLRUCache:
+    """
+    Two-tier LRU cache for bytes values.
+    Hot entries are kept in memory, every entry is stored on disk; both tiers
+    are capped in bytes and evict the least recently used entries first.
+    Keys must be safe file names (e.g. hex digests).
+    """
+
+    def __init__(self, name: str, directory: str, max_bytes: int, memory_bytes: int):
+        self.name = name
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._disk = OrderedDict()  # key -> size, in LRU order
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+        register_cache(name, self)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _load_index(self):
+        """Rebuild the disk index from the files left by a previous run."""
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".bin"):
+                stat = os.stat(os.path.join(self.directory, filename))
+                entries.append((stat.st_mtime, filename[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_size += size
+        self._evict_disk()
+
+    def _remember(self, key, value):
+        """Put a value in the memory tier (lock must be held)."""
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        if len(value) > self.memory_bytes:
+            return
+        self._memory[key] = value
+        self._memory_size += len(value)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _evict_disk(self):
+        """Delete least recently used files until under max_bytes (lock held)."""
+        while self._disk_size > self.max_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def get_hot(self, key):
+        """
+        Return a value only if it is in the memory tier. Never touches the disk,
+        so it is safe to call from the event loop.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self.memory_hits += 1
+                _observe(self.name, "memory_hit")
+                return self._memory[key]
+            return None
+
+    def get(self, key):
+        """Return the cached bytes for key, or None. May read from disk."""
+        value = self.get_hot(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            if key not in self._disk:
+                self.misses += 1
+                _observe(self.name, "miss")
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    value = f.read()
+            except OSError:
+                self._disk_size -= self._disk.pop(key)
+                self.misses += 1
+                _observe(self.name, "miss")
+                return None
+            # Persist recency across restarts through the file mtime
+            os.utime(self._path(key))
+            self._disk.move_to_end(key)
+            self._remember(key, value)
+            self.disk_hits += 1
+            _observe(self.name, "disk_hit")
+            return value
+
+    def set(self, key, value: bytes):
+        """Store bytes in both tiers, evicting old entries if needed."""
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, self._path(key))
+            if key in self._disk:
+                self._disk_size -= self._disk.pop(key)
+            self._disk[key] = len(value)
+            self._disk_size += len(value)
+            self._evict_disk()
+            self._remember(key, value)
+
+    def __len__(self):
+        return len(self._disk)
+
+    def stats(self) -> dict:
+        """Return sizes and per-tier hit/miss counters."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "items": len(self._disk),
+            "bytes": self._disk_size,
+            "memory_items": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
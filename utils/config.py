@@ -16,16 +16,37 @@ DEFAULT_LANG = "en"
 LANG_DIR = os.path.normpath(os.path.join(BASE_DIR, "../lang"))
 if not os.path.exists(LANG_DIR):
     os.makedirs(LANG_DIR)
+LANG_RELOAD_INTERVAL = 5  # Seconds between checks for changed language files
 PROMPT_DIR = os.path.normpath(os.path.join(BASE_DIR, "../prompts"))
 if not os.path.exists(PROMPT_DIR):
     os.makedirs(PROMPT_DIR)
 CONTEXT_FILE = os.path.normpath(os.path.join(BASE_DIR, "../config/context.json"))
+LOCALE_FILE = os.path.normpath(os.path.join(BASE_DIR, "../config/locale.json"))
 
 # --- File Size Limits (bytes) ---
 MAX_TXT_CSV_HTML_SIZE = 20 * 1024  # 20 KB
 MAX_PDF_SIZE = 1 * 1024 * 1024  # 1 MB
+MAX_OFFICE_DOC_SIZE = 1 * 1024 * 1024  # 1 MB (DOCX, ODT)
+MAX_IMAGE_SIZE = 8 * 1024 * 1024  # 8 MB (JPG, PNG, WEBP)
+MAX_ATTACHMENT_BYTES = 10 * 1024 * 1024  # Hard cap on bytes buffered per request
+ATTACHMENT_CHUNK_SIZE = 64 * 1024  # Read size when streaming downloads
+MAX_ATTACHMENTS = 5  # Attachments processed per request
+ATTACHMENT_TOKEN_BUDGET = 8000  # Total attachment tokens sent to Gemini per request
+TELEGRAM_MEDIA_GROUP_WAIT = 1.5  # Seconds to collect the documents of a media group
 MAX_DOC_LENGTH = 5000  # Truncate long content
 
+# --- Images ---
+IMAGE_MAX_DIMENSION = 1024  # Longest side (px) of images sent to Gemini
+IMAGE_JPEG_QUALITY = 80  # JPEG quality used when re-encoding
+IMAGE_CACHE_SIZE = 64  # Prepared images kept in memory
+
+# --- Long-document mode ---
+LONGDOC_MAX_CHARS = 400_000  # Upper bound on extracted text in long-document mode
+LONGDOC_CHUNK_TOKENS = 6000  # Token budget per summarized chunk
+LONGDOC_MAX_CONCURRENCY = 4  # Chunks summarized in parallel
+LONGDOC_CACHE_SIZE = 32  # Documents whose summary is kept in memory
+CHARS_PER_TOKEN = 4  # Rough estimate used for token budgets
+
 # --- Admin Settings ---
 DISCORD_ADMIN_ROLES = ["Admin", "Boss", "CoffyMaster"]
 DISCORD_FALLBACK_ID = int(
@@ -42,6 +63,12 @@ if not os.path.exists(LOG_DIR):
 BOT_LOG_FILE = "bot.log"
 SERVICE_LOG_FILE = "services.log"
 ERROR_LOG_FILE = "errors.log"
+LOG_QUEUE_SIZE = 10_000  # Records buffered for the log writer thread
+
+# --- Cache ---
+CACHE_DIR = os.path.normpath(os.path.join(BASE_DIR, "../cache"))
+if not os.path.exists(CACHE_DIR):
+    os.makedirs(CACHE_DIR)
 
 # --- DB ---
 DB_FILE = os.path.normpath(os.path.join(BASE_DIR, "../chatty.db"))
@@ -58,6 +85,70 @@ HF_MODEL_URL = (
     "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-2"
 )
 
+# --- HTTP client ---
+HTTP_TOTAL_TIMEOUT = 20  # Seconds for a whole request, body included
+HTTP_CONNECT_TIMEOUT = 5  # Seconds to obtain a connection
+HTTP_POOL_LIMIT = 50  # Open connections across all hosts
+HTTP_LIMIT_PER_HOST = 10  # Open connections per host
+HTTP_DNS_CACHE_TTL = 300  # Seconds DNS answers are reused
+HTTP_KEEPALIVE_TIMEOUT = 30  # Seconds idle connections are kept open
+
+# --- Metrics ---
+METRICS_HOST = "127.0.0.1"  # Local interface only
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 disables the endpoint
+
+# --- Event loop watchdog ---
+LOOP_HEARTBEAT_INTERVAL = 0.1  # Seconds between event loop heartbeats
+LOOP_SLOW_THRESHOLD = 0.25  # Blocking longer than this is logged with the stack
+LOOP_STALL_LOG_INTERVAL = 10  # Min seconds between two logged stack dumps
+
+# --- Performance dashboard ---
+PERF_SAMPLES = 2048  # Latency samples kept per command/service (ring buffer)
+PERF_TOTAL_SAMPLES = 20_000  # Samples kept for overall request and error rates
+PERF_WINDOW = 300  # Default window of /chatty-admin-perf (seconds)
+PERF_MAX_WINDOW = 3600  # Longest window that can be requested (seconds)
+PERF_SNAPSHOT_INTERVAL = 10  # Seconds between cache counter snapshots
+PERF_TOP_N = 10  # Commands/services listed in the report
+
+# --- Sampling profiler ---
+PROFILER_SECONDS = 10  # Default duration of /chatty-admin-profile
+PROFILER_MAX_SECONDS = 120  # Longest profile that can be requested
+PROFILER_INTERVAL = 0.005  # Seconds between stack samples
+PROFILER_TOP_N = 20  # Functions listed in the profile summary
+
+# --- Tracing ---
+TRACE_SAMPLE_RATE = float(
+    os.getenv("TRACE_SAMPLE_RATE", "0.1")
+)  # Share of requests traced (0 disables, 1 traces all)
+TRACE_LOG_FILE = "traces.jsonl"  # OTLP JSON lines, one trace per line
+TRACE_SERVICE_NAME = "coffybot"  # service.name resource attribute
+
+# --- Slow request capture ---
+SLOW_LOG_FILE = "slow.log"
+SLOW_REQUEST_THRESHOLD = 10.0  # Seconds, for commands not listed below
+SLOW_REQUEST_THRESHOLDS = {
+    "chatty": 30.0,
+    "message": 20.0,
+    "chatty_tts": 15.0,
+    "chatty_meteo": 5.0,
+    "chatty_wiki": 5.0,
+    "chatty_info": 2.0,
+    "chatty_help": 2.0,
+    "chatty_admin_profile": None,
+    "chatty_admin_memory": None,
+}  # Seconds per command ("-" and "_" are equivalent); None is never captured
+SLOW_LOG_MAX_PER_MINUTE = 10  # Captures written per minute, the rest are counted
+
+# --- Memory profiling ---
+MEMORY_TRACE_ON_START = (
+    os.getenv("MEMORY_TRACE_ON_START", "0") == "1"
+)  # Trace from boot
+MEMORY_TRACE_FRAMES = 5  # Stack frames stored per traced allocation
+MEMORY_TOP_N = 20  # Allocation sites listed in a diff
+DISCORD_MAX_MESSAGES = int(
+    os.getenv("DISCORD_MAX_MESSAGES", "1000")
+)  # Messages kept in the discord.py cache
+
 # --- Gemini ---
 MODELS_FILE = os.path.normpath(os.path.join(BASE_DIR, "../config/models.json"))
 DEFAULT_MODEL = "gemini-1.5-flash"
@@ -74,6 +165,35 @@ WEATHER_EMOJIS = {
     "fog": "🌫️",
     "haze": "🌫️",
 }
+WEATHER_LANG = "it"  # OpenWeather language for servers/chats without a locale
+WEATHER_CURRENT_TTL = 10 * 60  # Seconds current conditions are reused
+WEATHER_FORECAST_TTL = 60 * 60  # Seconds a 5-day forecast is reused
+WEATHER_CACHE_SIZE = 256  # Cities kept per cache
+GEOCODING_DB_FILE = os.path.join(CACHE_DIR, "geocoding.db")
+
+# --- Wikipedia ---
+WIKI_LANG = "it"  # Wikipedia edition for servers/chats without a locale
+WIKI_CACHE_TTL = 60 * 60  # Seconds a summary is served without revalidation
+WIKI_CACHE_MAX_AGE = 24 * 60 * 60  # Seconds a summary is kept for revalidation
+WIKI_NEGATIVE_TTL = 5 * 60  # Seconds a missing page is remembered
+WIKI_CACHE_SIZE = 256  # Summaries (and resolved terms) kept in memory
+WIKI_SEARCH_CANDIDATES = 3  # Search results fetched to pick the best page
+WIKI_TITLE_TTL = 24 * 60 * 60  # Seconds a term -> title resolution is reused
+
+# --- Cache warming ---
+CACHE_WARM_INTERVAL = 60  # Seconds between warming passes
+CACHE_WARM_TOP_N = 10  # Most requested cities / terms kept warm
+CACHE_WARM_MIN_REQUESTS = 2  # Requests needed before a key is warmed
+CACHE_WARM_MARGIN = 3 * 60  # Refresh entries expiring within this many seconds
+CACHE_WARM_MAX_PER_MINUTE = 6  # Upstream calls the warmer may spend per minute
+CACHE_WARM_QUIET = 2  # Seconds without live requests before warming a key
+CACHE_WARM_DECAY_INTERVAL = 60 * 60  # Seconds between halvings of request counts
 
 # --- TTS ---
 DEFAULT_TTS_LANG = "it"
+TTS_TIMEOUT = 30  # Seconds allowed for a single synthesis
+TTS_CACHE_DIR = os.path.join(CACHE_DIR, "tts")
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 50 MB of audio on disk
+TTS_CACHE_MEMORY_BYTES = 5 * 1024 * 1024  # 5 MB of hot audio in memory
+TTS_CHUNK_CHARS = 400  # Long texts are split at sentence boundaries into chunks
+TTS_MAX_CONCURRENCY = 4  # Chunks synthesized in parallel (all requests)
@@ -4,7 +4,11 @@ import json
 import os
 
 from utils.logger import bot_logger
-from utils.config import CONTEXT_FILE, PROMPT_DIR
+from utils.localization import available_languages
+from utils.config import CONTEXT_FILE, LOCALE_FILE, PROMPT_DIR
+
+# server_name -> language code, loaded once from LOCALE_FILE
+locale_table = {}
 
 
 def get_server_context():
@@ -114,3 +118,81 @@ def reset_context(server_name: str):
         del context[server_name]
         save_context_to_file(context)
         bot_logger.info("Context reset for server '%s'", server_name)
+
+
+def load_locales():
+    """
+    Load the locale mapping from disk into the in-memory table.
+    Should be called once at startup.
+    """
+    try:
+        with open(LOCALE_FILE, "r", encoding="utf-8") as f:
+            locale_table.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        bot_logger.error("Failed to load locales: %s", str(e))
+
+
+def save_locales():
+    """
+    Save the in-memory locale mapping to disk.
+    """
+    try:
+        with open(LOCALE_FILE, "w", encoding="utf-8") as f:
+            json.dump(locale_table, f, indent=4)
+    except Exception as e:
+        bot_logger.error("Failed to save locales: %s", str(e))
+
+
+def get_locale(server_name: str):
+    """
+    Return the locale configured for a server or chat (in-memory lookup).
+
+    Args:
+        server_name (str): The server's name.
+
+    Returns:
+        str | None: Language code, or None if no locale is set.
+    """
+    return locale_table.get(server_name)
+
+
+def set_locale(server_name: str, lang: str) -> bool:
+    """
+    Set the locale of a server or chat and save the mapping.
+
+    Args:
+        server_name (str): The server's name.
+        lang (str): Language code; must have a file in lang/.
+
+    Returns:
+        bool: True if successful, False if the language is not available.
+    """
+    lang = lang.strip().lower()
+    if lang not in available_languages():
+        bot_logger.warning(
+            "Attempted to set unavailable locale '%s' for server '%s'",
+            lang,
+            server_name,
+        )
+        return False
+    locale_table[server_name] = lang
+    save_locales()
+    bot_logger.info("Locale '%s' set for server '%s'", lang, server_name)
+    return True
+
+
+def reset_locale(server_name: str):
+    """
+    Remove the locale of a server or chat, restoring the defaults.
+
+    Args:
+        server_name (str): The server's name.
+    """
+    if locale_table.pop(server_name, None):
+        save_locales()
+        bot_logger.info("Locale reset for server '%s'", server_name)
+
+
+load_locales()
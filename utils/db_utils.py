@@ -4,6 +4,7 @@ import sqlite3
 import datetime
 
 from utils.config import DB_FILE
+from utils.metrics import observe_upstream
 
 conn = sqlite3.connect(DB_FILE, check_same_thread=False)
 cursor = conn.cursor()
@@ -39,19 +40,20 @@ def log_to_sqlite(user_obj, channel_obj, message, response):
         response (str): Bot response.
     """
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute(
-        """INSERT INTO conversations (timestamp, user, user_id, channel, message, response)
-                      VALUES (?, ?, ?, ?, ?, ?)""",
-        (
-            timestamp,
-            user_obj.name,
-            str(user_obj.id),
-            channel_obj.name if hasattr(channel_obj, "name") else "DM",
-            message,
-            response,
-        ),
-    )
-    conn.commit()
+    with observe_upstream("sqlite"):
+        cursor.execute(
+            """INSERT INTO conversations (timestamp, user, user_id, channel, message, response)
+                          VALUES (?, ?, ?, ?, ?, ?)""",
+            (
+                timestamp,
+                user_obj.name,
+                str(user_obj.id),
+                channel_obj.name if hasattr(channel_obj, "name") else "DM",
+                message,
+                response,
+            ),
+        )
+        conn.commit()
 
 
 def close_db():
@@ -4,26 +4,21 @@ import asyncio
 import os
 import functools
 import discord
-import io
-import fitz  # PyMuPDF
 
-from bs4 import BeautifulSoup
-from docx import Document
-from odf.opendocument import load
-from odf.text import P
+from contextlib import contextmanager
+
 from telegram import Update, User, Chat
 from telegram.ext import ContextTypes
 from discord import Interaction
 
 
-from utils.localization import translate
+from utils.localization import translate, current_lang
+from utils.context import get_locale
 from utils.logger import bot_logger
+from utils.request_context import request_scope, set_request_outcome
 from utils.config import (
     DISCORD_ADMIN_ROLES,
     DISCORD_FALLBACK_ID,
-    MAX_PDF_SIZE,
-    MAX_TXT_CSV_HTML_SIZE,
-    DISCORD_FALLBACK_ID,
     TELEGRAM_FALLBACK_ID,
 )
 
@@ -107,64 +102,42 @@ def resolve_server_name(user: User, chat: Chat) -> str:
         return user.username or f"User-{user.id}"
 
 
-async def read_file_content(attachment):
+def discord_server_name(source) -> str:
     """
-    Read the content of a supported file attachment.
-
-    Supports TXT, CSV, HTML, PDF, DOCX, ODT formats with size limits.
-    Converts content to plain text.
+    Return the server_name used for per-server settings (context, locale,
+    metrics) of a Discord interaction or message: the guild name, or
+    "DM-<user name>" in direct messages.
 
     Args:
-        attachment (discord.Attachment): The uploaded file.
+        source (Interaction | Message): The interaction or message.
+    """
+    if source.guild:
+        return source.guild.name
+    user = source.author if isinstance(source, discord.Message) else source.user
+    return f"DM-{user.name}"
 
-    Returns:
-        str: Extracted text or error message.
+
+@contextmanager
+def server_locale(server_name):
     """
+    Apply the locale of a server/chat to the enclosed block.
+
+    Args:
+        server_name (str | None): Server/chat name; None for the default locale.
+    """
+    token = current_lang.set(get_locale(server_name) if server_name else None)
     try:
-        filename = attachment.filename.lower()
-        if filename.endswith((".txt", ".csv", ".html")):
-            if attachment.size <= MAX_TXT_CSV_HTML_SIZE:
-                file_bytes = await attachment.read()
-                if filename.endswith(".html"):
-                    soup = BeautifulSoup(file_bytes, "html.parser")
-                    return soup.get_text()
-                return file_bytes.decode("utf-8", errors="ignore")
-            else:
-                return translate("file_too_large_small", filename=filename)
-
-        elif filename.endswith(".pdf"):
-            if attachment.size <= MAX_PDF_SIZE:
-                file_bytes = await attachment.read()
-                with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-                    text = "".join([page.get_text() for page in doc])
-                    return text[:5000]
-            else:
-                return translate("file_too_large_pdf", filename=filename)
-
-        elif filename.endswith(".docx"):
-            file_bytes = await attachment.read()
-            doc = Document(io.BytesIO(file_bytes))
-            text = "\n".join([p.text for p in doc.paragraphs])
-            return text[:5000]
-
-        elif filename.endswith(".odt"):
-            file_bytes = await attachment.read()
-            odt_doc = load(io.BytesIO(file_bytes))
-            text = "\n".join([str(p) for p in odt_doc.getElementsByType(P)])
-            return text[:5000]
-
-        else:
-            return translate("file_format_not_supported", filename=filename)
-
-    except Exception as e:
-        return translate("file_reading_error", error=e)
+        yield
+    finally:
+        current_lang.reset(token)
 
 
 def handle_errors(command_name: str):
     """
     Decorator to handle exceptions in Discord commands.
 
-    Logs the error and sends a localized error message to the user.
+    Opens a request context, applies the server locale for the duration of
+    the command, logs errors and sends a localized error message to the user.
 
     Args:
         command_name (str): Name of the command for logging.
@@ -172,20 +145,63 @@ def handle_errors(command_name: str):
 
     def decorator(func):
         @functools.wraps(func)
-        async def wrapper(interaction, *args, **kwargs):
-            try:
-                await func(interaction, *args, **kwargs)
-            except Exception as e:
-                bot_logger.error("Error in command %s: %s", command_name, str(e))
+        async def wrapper(*args, **kwargs):
+            # Cog commands receive (self, interaction, ...)
+            interaction = next(
+                (a for a in args if isinstance(a, discord.Interaction)), None
+            )
+            server_name = discord_server_name(interaction) if interaction else None
+            with server_locale(server_name), request_scope(
+                "discord",
+                command_name,
+                server_name,
+                interaction.user.id if interaction else None,
+                interaction.created_at if interaction else None,
+            ):
                 try:
-                    if interaction.response.is_done():
-                        await interaction.followup.send(translate("generic_error"))
-                    else:
-                        await interaction.response.send_message(
-                            translate("generic_error"), ephemeral=True
-                        )
-                except Exception:
-                    bot_logger.error("Failed to send error message to user.")
+                    await func(*args, **kwargs)
+                except Exception as e:
+                    set_request_outcome("error", e)
+                    bot_logger.error("Error in command %s: %s", command_name, str(e))
+                    try:
+                        if interaction.response.is_done():
+                            await interaction.followup.send(translate("generic_error"))
+                        else:
+                            await interaction.response.send_message(
+                                translate("generic_error"), ephemeral=True
+                            )
+                    except Exception:
+                        bot_logger.error("Failed to send error message to user.")
+
+        return wrapper
+
+    return decorator
+
+
+def track_telegram_request(command_name: str):
+    """
+    Decorator opening a request context around a Telegram handler and
+    applying the chat locale for its duration.
+
+    Args:
+        command_name (str): Name of the command for the request log.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            user = update.effective_user
+            chat = update.effective_chat
+            message = update.effective_message
+            server_name = resolve_server_name(user, chat) if user and chat else None
+            with server_locale(server_name), request_scope(
+                "telegram",
+                command_name,
+                server_name,
+                user.id if user else None,
+                message.date if message else None,
+            ):
+                return await func(update, context)
 
         return wrapper
 
@@ -0,0 +1,61 @@
+# utils/images.py
+
+"""
+Image preparation for multimodal Gemini requests.
+Images are downscaled and re-encoded locally before upload; metadata (EXIF)
+is dropped in the process. Results are cached by content hash.
+"""
+
+import io
+import hashlib
+
+from PIL import Image, ImageOps
+
+from utils.cache import LRUCache
+from utils.config import IMAGE_MAX_DIMENSION, IMAGE_JPEG_QUALITY, IMAGE_CACHE_SIZE
+
+image_cache = LRUCache("image_thumbnails", IMAGE_CACHE_SIZE)
+
+
+def downscale_image(data: bytes) -> bytes:
+    """
+    Downscale an image to IMAGE_MAX_DIMENSION and re-encode it as JPEG.
+
+    The EXIF orientation is applied to the pixels and then discarded together
+    with every other metadata block.
+
+    Args:
+        data (bytes): Original image bytes (JPEG, PNG, WEBP...).
+
+    Returns:
+        bytes: JPEG-encoded image.
+    """
+    size = (IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION)
+    with Image.open(io.BytesIO(data)) as img:
+        # For JPEG sources, decode directly at a reduced scale
+        img.draft("RGB", size)
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(size)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True)
+        return out.getvalue()
+
+
+def prepare_image(data: bytes) -> dict:
+    """
+    Return a Gemini inline image part for the given image, using the cache.
+
+    Args:
+        data (bytes): Original image bytes.
+
+    Returns:
+        dict: {"mime_type": "image/jpeg", "data": bytes}
+    """
+    key = (hashlib.sha256(data).hexdigest(), IMAGE_MAX_DIMENSION, IMAGE_JPEG_QUALITY)
+    prepared = image_cache.get(key)
+    if prepared is None:
+        prepared = downscale_image(data)
+        image_cache.set(key, prepared)
+    return {"mime_type": "image/jpeg", "data": prepared}
@@ -1,12 +1,270 @@
 # utils/localization.py
 
+"""
+Translation catalogs.
+Language files in lang/ are compiled into immutable catalogs of pre-parsed
+templates, with the fallback chain (e.g. pt_BR -> pt -> DEFAULT_LANG) already
+merged in, so a lookup is a single dict access. Placeholders are validated at
+load time against the other languages and against translate() calls in the
+source. The catalogs are rebuilt and swapped atomically when a file changes.
+"""
+
+import ast
 import locale
 import json
 import os
+import string
+import threading
+import time
+
+from contextvars import ContextVar
+from types import MappingProxyType
+
+from utils.config import LANG_DIR, DEFAULT_LANG, LANG_RELOAD_INTERVAL
+from utils.logger import bot_logger, error_logger
+from utils.memory import register_size
+
+# Locale of the server/chat being served, set once per request (None = default)
+current_lang = ContextVar("current_lang", default=None)
+
+PROJECT_DIR = os.path.dirname(LANG_DIR)
+# Bot sources checked for translate() usage (plus the top-level bot_*.py)
+SOURCE_DIRS = ("cogs", "telegram_commands", "core", "services", "utils")
+_formatter = string.Formatter()
+
+
+class Template:
+    """
+    A translation string with its replacement field names parsed once.
+    """
+
+    __slots__ = ("text", "fields")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.fields = frozenset(
+            name.split(".")[0].split("[")[0]
+            for _, name, _, _ in _formatter.parse(text)
+            if name
+        )
+
+    def render(self, kwargs: dict) -> str:
+        """
+        Render the template. Missing fields are logged and left as "{name}"
+        instead of raising.
+        """
+        if not self.fields:
+            return self.text
+        missing = self.fields - kwargs.keys()
+        if not missing:
+            return self.text.format(**kwargs)
+        error_logger.error(
+            "Missing placeholders %s for template: %r", sorted(missing), self.text
+        )
+        try:
+            return self.text.format(**{f: "{" + f + "}" for f in missing}, **kwargs)
+        except (AttributeError, IndexError, KeyError, ValueError):
+            return self.text
+
+
+class Catalogs:
+    """
+    Immutable set of compiled catalogs: language -> {key: Template}.
+    """
+
+    def __init__(self, catalogs: dict, signature: tuple):
+        self.catalogs = MappingProxyType(catalogs)
+        self.signature = signature
+
+    def get(self, lang: str):
+        """Return the catalog of a language, resolving unknown ones by chain."""
+        catalog = self.catalogs.get(lang)
+        if catalog is None:
+            catalog = self.catalogs.get(lang.split("_")[0], self.catalogs[DEFAULT_LANG])
+        return catalog
+
+
+def _lang_files() -> dict:
+    return {
+        f[:-5]: os.path.join(LANG_DIR, f)
+        for f in os.listdir(LANG_DIR)
+        if f.endswith(".json")
+    }
+
+
+def _signature(files: dict) -> tuple:
+    """Return a value that changes whenever a language file changes."""
+    return tuple(
+        sorted((lang, os.stat(path).st_mtime_ns) for lang, path in files.items())
+    )
+
+
+def fallback_chain(lang: str) -> list[str]:
+    """
+    Return the languages consulted for a code, most specific first.
+
+    Args:
+        lang (str): Language code (e.g. 'pt_BR').
+
+    Returns:
+        list[str]: e.g. ['pt_BR', 'pt', 'en'].
+    """
+    chain = [lang]
+    if "_" in lang:
+        chain.append(lang.split("_")[0])
+    if DEFAULT_LANG not in chain:
+        chain.append(DEFAULT_LANG)
+    return chain
+
+
+def _validate_languages(raw: dict):
+    """Log keys missing from a language and placeholders differing from DEFAULT_LANG."""
+    reference = raw.get(DEFAULT_LANG, {})
+    for lang, templates in raw.items():
+        if lang == DEFAULT_LANG:
+            continue
+        for key, template in templates.items():
+            base = reference.get(key)
+            if base is None:
+                bot_logger.warning("Translation '%s' only exists in '%s'", key, lang)
+            elif template.fields != base.fields:
+                error_logger.error(
+                    "Placeholders of '%s' in '%s' %s differ from '%s' %s",
+                    key,
+                    lang,
+                    sorted(template.fields),
+                    DEFAULT_LANG,
+                    sorted(base.fields),
+                )
+        for key in reference.keys() - templates.keys():
+            bot_logger.warning("Translation '%s' missing in '%s'", key, lang)
+
+
+def _source_files(root: str):
+    """Yield the .py files of the bot packages (SOURCE_DIRS) and bot_*.py."""
+    for filename in sorted(os.listdir(root)):
+        if filename.startswith("bot_") and filename.endswith(".py"):
+            yield os.path.join(root, filename)
+    for package in SOURCE_DIRS:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, package)):
+            dirnames[:] = [d for d in dirnames if not d.startswith((".", "__"))]
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    yield os.path.join(dirpath, filename)
+
+
+def find_translate_calls(root: str = PROJECT_DIR):
+    """
+    Yield (path, line, key, keyword names or None) for every translate() call
+    with a literal key in the bot sources. Keywords are None when the call
+    passes **kwargs.
+    """
+    for path in _source_files(root):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read(), path)
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call) or not node.args:
+                continue
+            func = node.func
+            name = getattr(func, "id", None) or getattr(func, "attr", None)
+            key = node.args[0]
+            if name != "translate" or not isinstance(key, ast.Constant):
+                continue
+            keywords = {k.arg for k in node.keywords}
+            yield path, node.lineno, key.value, (
+                None if None in keywords else keywords - {"lang"}
+            )
+
 
-from utils.config import LANG_DIR, DEFAULT_LANG
+def _validate_usage(catalog: dict):
+    """Log translate() calls with unknown keys or missing placeholder arguments."""
+    for path, line, key, keywords in find_translate_calls():
+        where = f"{os.path.relpath(path, PROJECT_DIR)}:{line}"
+        template = catalog.get(key)
+        if template is None:
+            error_logger.error("Unknown translation key '%s' at %s", key, where)
+        elif keywords is not None and not template.fields <= keywords:
+            error_logger.error(
+                "translate('%s') at %s lacks placeholders %s",
+                key,
+                where,
+                sorted(template.fields - keywords),
+            )
 
-language_cache = {}
+
+def compile_catalogs(validate_usage: bool = False) -> Catalogs:
+    """
+    Compile every language file into a catalog with its fallback chain merged.
+
+    Args:
+        validate_usage (bool): Also check translate() calls in the sources.
+
+    Returns:
+        Catalogs: The compiled catalogs.
+    """
+    files = _lang_files()
+    signature = _signature(files)
+    raw = {}
+    for lang, path in files.items():
+        with open(path, "r", encoding="utf-8") as f:
+            raw[lang] = {key: Template(text) for key, text in json.load(f).items()}
+
+    _validate_languages(raw)
+    catalogs = {}
+    for lang in raw:
+        merged = {}
+        for fallback in reversed(fallback_chain(lang)):
+            merged.update(raw.get(fallback, {}))
+        catalogs[lang] = MappingProxyType(merged)
+
+    if validate_usage:
+        _validate_usage(catalogs[DEFAULT_LANG])
+    return Catalogs(catalogs, signature)
+
+
+_catalogs = compile_catalogs(validate_usage=True)
+_next_check = time.monotonic() + LANG_RELOAD_INTERVAL
+_reload_lock = threading.Lock()
+register_size(
+    "lang_templates", lambda: sum(len(c) for c in _catalogs.catalogs.values())
+)
+
+
+def reload_if_changed(force: bool = False) -> bool:
+    """
+    Recompile the catalogs if a language file was added, removed or modified.
+    The new catalogs replace the old ones in a single assignment.
+
+    Args:
+        force (bool): Recompile even if nothing changed.
+
+    Returns:
+        bool: True if the catalogs were reloaded.
+    """
+    global _catalogs
+    with _reload_lock:
+        try:
+            if not force and _signature(_lang_files()) == _catalogs.signature:
+                return False
+            _catalogs = compile_catalogs()
+        except Exception as e:
+            error_logger.error("Failed to reload language files: %s", str(e))
+            return False
+    bot_logger.info("Language files reloaded")
+    return True
+
+
+def _current_catalogs() -> Catalogs:
+    """Return the catalogs, checking for changed files every LANG_RELOAD_INTERVAL."""
+    global _next_check
+    now = time.monotonic()
+    if now >= _next_check:
+        _next_check = now + LANG_RELOAD_INTERVAL
+        reload_if_changed()
+    return _catalogs
 
 
 def detect_system_language():
@@ -24,7 +282,7 @@ def detect_system_language():
 
 def load_language(lang_code):
     """
-    Load the translation JSON file for the specified language.
+    Return the translations for the specified language, fallbacks included.
 
     Args:
         lang_code (str): Language code.
@@ -32,31 +290,65 @@ def load_language(lang_code):
     Returns:
         dict: Dictionary of translation keys and values.
     """
-    if lang_code in language_cache:
-        return language_cache[lang_code]
+    catalog = _current_catalogs().get(lang_code)
+    return {key: template.text for key, template in catalog.items()}
+
 
-    path = os.path.join(LANG_DIR, f"{lang_code}.json")
-    if not os.path.isfile(path):
-        path = os.path.join(LANG_DIR, f"{DEFAULT_LANG}.json")
+def available_languages() -> list[str]:
+    """
+    List the language codes that have a translation file.
+
+    Returns:
+        list[str]: Sorted language codes (e.g. ['en', 'it']).
+    """
+    return sorted(_current_catalogs().catalogs)
 
-    with open(path, "r", encoding="utf-8") as f:
-        translations = json.load(f)
-        language_cache[lang_code] = translations
-        return translations
 
+def get_current_lang():
+    """
+    Return the locale of the current request.
 
-def translate(key, lang="en", **kwargs):
+    Returns:
+        str | None: Language code, or None if the server/chat has no locale set.
+    """
+    return current_lang.get()
+
+
+def translate(key, lang=None, **kwargs):
     """
     Translate a key using the loaded language file, with optional formatting.
 
     Args:
         key (str): Translation key.
-        lang (str): Language code. Defaults to 'en'.
+        lang (str, optional): Language code. Defaults to the locale of the
+            current request, then DEFAULT_LANG.
         **kwargs: Optional formatting arguments for the text.
 
     Returns:
         str: Translated and formatted string.
     """
-    translations = load_language(lang)
-    text = translations.get(key, f"[{key}]")
-    return text.format(**kwargs)
+    catalog = _current_catalogs().get(lang or current_lang.get() or DEFAULT_LANG)
+    template = catalog.get(key)
+    if template is None:
+        return f"[{key}]"
+    return template.render(kwargs)
+
+
+def translate_many(items, lang=None) -> list[str]:
+    """
+    Translate several keys at once against the same catalog.
+
+    Args:
+        items (Iterable): Keys, or (key, kwargs dict) pairs.
+        lang (str, optional): Language code, as in translate().
+
+    Returns:
+        list[str]: Translated strings, in the same order.
+    """
+    catalog = _current_catalogs().get(lang or current_lang.get() or DEFAULT_LANG)
+    results = []
+    for item in items:
+        key, kwargs = (item, {}) if isinstance(item, str) else item
+        template = catalog.get(key)
+        results.append(template.render(kwargs) if template else f"[{key}]")
+    return results
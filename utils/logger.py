@@ -1,13 +1,84 @@
 # utils/logger.py
 
+"""
+Non-blocking logging.
+Loggers only put records on a bounded queue; a single background
+QueueListener owns the rotating file handlers and writes (and rotates) the
+files, so a slow disk never blocks the event loop. When the queue is full,
+records are dropped and counted per log file.
+Every record carries the id of the request being served ("-" outside one).
+"""
+
+import atexit
 import logging
 import os
+import queue
+
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from utils.config import LOG_DIR, LOG_QUEUE_SIZE
+
+log_queue = queue.Queue(LOG_QUEUE_SIZE)
+file_handlers = {}  # log file name -> RotatingFileHandler
+dropped_records = {}  # log file name -> records dropped on a full queue
+
+# Set by utils.request_context for the duration of a request
+request_id_var = ContextVar("request_id", default="-")
+
+DEFAULT_FORMAT = "%(asctime)s [%(levelname)s] [%(request_id)s] %(message)s"
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Queue handler that tags records with their log file and drops them,
+    counting, instead of blocking or raising when the queue is full.
+    """
+
+    def __init__(self, log_queue, destination: str):
+        super().__init__(log_queue)
+        self.destination = destination
+
+    def prepare(self, record):
+        # Runs in the thread that logged, where the request contextvars are set
+        record.request_id = request_id_var.get()
+        record = super().prepare(record)
+        record.log_destination = self.destination
+        return record
 
-from logging.handlers import RotatingFileHandler
-from utils.config import LOG_DIR
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_records[self.destination] = (
+                dropped_records.get(self.destination, 0) + 1
+            )
 
 
-def setup_logger(name: str, log_file: str, level=logging.INFO) -> logging.Logger:
+class RoutingHandler(logging.Handler):
+    """
+    Listener-side handler that writes each record to the file it was tagged with.
+    """
+
+    def handle(self, record):
+        handler = file_handlers.get(getattr(record, "log_destination", None))
+        if handler:
+            handler.handle(record)
+        return True
+
+
+class FlushingQueueListener(QueueListener):
+    """
+    Queue listener whose stop sentinel waits for room in a full queue,
+    so stopping always writes every record queued before it.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def setup_logger(
+    name: str, log_file: str, level=logging.INFO, fmt: str = DEFAULT_FORMAT
+) -> logging.Logger:
     """
     Create and configure a rotating logger.
 
@@ -15,6 +86,7 @@ def setup_logger(name: str, log_file: str, level=logging.INFO) -> logging.Logger
         name (str): Logger name.
         log_file (str): File name for the log.
         level (int): Logging level.
+        fmt (str): Record format.
 
     Returns:
         Logger: Configured rotating logger.
@@ -24,18 +96,72 @@ def setup_logger(name: str, log_file: str, level=logging.INFO) -> logging.Logger
     handler = RotatingFileHandler(
         filepath, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8"
     )
-    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    formatter = logging.Formatter(fmt)
     handler.setFormatter(formatter)
+    file_handlers[log_file] = handler
 
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    logger.addHandler(handler)
+    logger.addHandler(BoundedQueueHandler(log_queue, log_file))
     logger.propagate = False  # Prevent double logging on console
 
     return logger
 
 
+def route_logger(name: str, log_file: str, level=logging.INFO) -> logging.Logger:
+    """
+    Send the records of an existing logger (e.g. a library's) to one of our
+    log files through the queue.
+
+    Args:
+        name (str): Logger name (e.g. "asyncio").
+        log_file (str): Log file already set up with setup_logger().
+        level (int): Logging level.
+
+    Returns:
+        Logger: The routed logger.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    if not any(
+        isinstance(h, BoundedQueueHandler) and h.destination == log_file
+        for h in logger.handlers
+    ):
+        logger.addHandler(BoundedQueueHandler(log_queue, log_file))
+    logger.propagate = False
+    return logger
+
+
+def get_log_stats() -> dict:
+    """
+    Return the logging queue state.
+
+    Returns:
+        dict: {"queued": int, "capacity": int, "dropped": {log file: count}}
+    """
+    return {
+        "queued": log_queue.qsize(),
+        "capacity": LOG_QUEUE_SIZE,
+        "dropped": dict(dropped_records),
+    }
+
+
+def stop_logging():
+    """
+    Stop the background listener after writing every queued record.
+    Safe to call more than once.
+    """
+    if log_listener._thread is not None:
+        log_listener.stop()
+        for handler in file_handlers.values():
+            handler.close()
+
+
 # Loggers with rotation
 bot_logger = setup_logger("bot", "bot.log")
 service_logger = setup_logger("services", "services.log")
 error_logger = setup_logger("errors", "errors.log", level=logging.ERROR)
+
+log_listener = FlushingQueueListener(log_queue, RoutingHandler())
+log_listener.start()
+atexit.register(stop_logging)
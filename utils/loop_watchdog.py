@@ -0,0 +1,145 @@
+# utils/loop_watchdog.py
+
+"""
+Event loop watchdog.
+A heartbeat task wakes up every LOOP_HEARTBEAT_INTERVAL and records how late
+it was (scheduling lag) in the metrics. A separate thread watches the
+heartbeat: when the loop has been blocked for more than LOOP_SLOW_THRESHOLD,
+it logs the running task and the stack of the loop thread, i.e. the code
+that is blocking. asyncio debug mode can be switched on at runtime for
+per-callback reports from asyncio itself.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+
+from utils.logger import bot_logger, route_logger, request_id_var
+from utils.metrics import loop_lag, loop_lag_histogram, loop_stalls
+from utils.config import (
+    LOOP_HEARTBEAT_INTERVAL,
+    LOOP_SLOW_THRESHOLD,
+    LOOP_STALL_LOG_INTERVAL,
+)
+
+
+def _describe_task(task) -> str:
+    """Return the name, coroutine and request id of a task."""
+    if task is None:
+        return "no task (plain callback)"
+    coro = task.get_coro()
+    name = getattr(coro, "__qualname__", repr(coro))
+    description = f"task {task.get_name()} ({name})"
+    get_context = getattr(task, "get_context", None)  # Python 3.12+
+    if get_context:
+        description += f" request {get_context().get(request_id_var, '-')}"
+    return description
+
+
+class LoopWatchdog:
+    """
+    Heartbeat task plus watcher thread for one event loop.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.loop_thread_id = None
+        self.last_beat = time.monotonic()
+        self.last_lag = 0.0
+        self.stalls = 0
+        self._reported_beat = None
+        self._last_dump = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    async def run(self):
+        """
+        Beat forever, recording the loop lag; starts the watcher thread.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+        try:
+            while True:
+                start = time.monotonic()
+                await asyncio.sleep(LOOP_HEARTBEAT_INTERVAL)
+                self.last_beat = time.monotonic()
+                lag = max(0.0, self.last_beat - start - LOOP_HEARTBEAT_INTERVAL)
+                self.last_lag = lag
+                loop_lag.set(lag)
+                loop_lag_histogram.observe(lag)
+                if lag > LOOP_SLOW_THRESHOLD:
+                    self.stalls += 1
+                    loop_stalls.inc()
+                    bot_logger.warning("Event loop was blocked for %.3fs", lag)
+        finally:
+            self._stop.set()
+
+    def _watch(self):
+        """Watcher thread: dump the loop stack once per stall."""
+        while not self._stop.wait(LOOP_HEARTBEAT_INTERVAL / 2):
+            beat = self.last_beat
+            blocked = time.monotonic() - beat - LOOP_HEARTBEAT_INTERVAL
+            if blocked < LOOP_SLOW_THRESHOLD or beat == self._reported_beat:
+                continue
+            self._reported_beat = beat
+            now = time.monotonic()
+            if now - self._last_dump < LOOP_STALL_LOG_INTERVAL:
+                continue
+            self._last_dump = now
+            self.dump_stack(blocked)
+
+    def dump_stack(self, blocked: float):
+        """
+        Log the task and the stack currently running on the loop thread.
+
+        Args:
+            blocked (float): Seconds the loop has been blocked so far.
+        """
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        task = asyncio.current_task(self.loop)
+        bot_logger.warning(
+            "Event loop blocked for more than %.3fs by %s:\n%s",
+            blocked,
+            _describe_task(task),
+            stack,
+        )
+
+    def set_debug(self, enabled: bool):
+        """
+        Switch asyncio debug mode on the watched loop. In debug mode asyncio
+        logs every callback slower than LOOP_SLOW_THRESHOLD to bot.log.
+        Must be called from the event loop thread.
+
+        Args:
+            enabled (bool): New debug state.
+        """
+        if self.loop is None:
+            return
+        route_logger("asyncio", "bot.log", logging.WARNING)
+        self.loop.slow_callback_duration = LOOP_SLOW_THRESHOLD
+        self.loop.set_debug(enabled)
+        bot_logger.info("asyncio debug mode %s", "enabled" if enabled else "disabled")
+
+    def is_debug(self) -> bool:
+        """
+        Tell whether asyncio debug mode is on.
+
+        Returns:
+            bool: True if the watched loop is in debug mode.
+        """
+        return bool(self.loop and self.loop.get_debug())
+
+
+loop_watchdog = LoopWatchdog()
@@ -0,0 +1,188 @@
+# utils/memory.py
+
+"""
+Memory inspection for long-running processes.
+tracemalloc is started on demand (or at boot with MEMORY_TRACE_ON_START),
+a baseline snapshot is kept, and later snapshots are diffed against it to
+find the allocation sites that keep growing. Known in-memory structures
+(discord.py message cache, language catalogs, pending media groups...)
+register a size callback, like caches register their statistics.
+"""
+
+import time
+import asyncio
+import tracemalloc
+
+from utils.cache import get_cache_stats
+from utils.logger import bot_logger
+from utils.config import MEMORY_TRACE_FRAMES, MEMORY_TOP_N
+
+size_registry = {}  # structure name -> callable returning its number of items
+
+MEMORY_ACTIONS = ("diff", "start", "baseline", "stop")
+
+_baseline = None  # (monotonic time, tracemalloc.Snapshot)
+
+# Allocations made by the tracing machinery itself
+_NOISE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def register_size(name: str, size):
+    """
+    Register an in-memory structure whose size is reported.
+
+    Args:
+        name (str): Structure name.
+        size (Callable[[], int]): Returns the number of items it holds.
+    """
+    size_registry[name] = size
+
+
+def get_sizes() -> dict:
+    """
+    Return the size of every registered structure.
+
+    Returns:
+        dict: Mapping of structure name -> items.
+    """
+    sizes = {}
+    for name, size in size_registry.items():
+        try:
+            sizes[name] = size()
+        except Exception:
+            sizes[name] = -1
+    return sizes
+
+
+def is_tracing() -> bool:
+    """
+    Tell whether tracemalloc is running.
+
+    Returns:
+        bool: True if allocations are being traced.
+    """
+    return tracemalloc.is_tracing()
+
+
+def take_baseline():
+    """Snapshot the current allocations as the reference for later diffs."""
+    global _baseline
+    snapshot = tracemalloc.take_snapshot().filter_traces(_NOISE_FILTERS)
+    _baseline = (time.monotonic(), snapshot)
+
+
+def start_tracing() -> bool:
+    """
+    Start tracemalloc and take a baseline snapshot.
+
+    Returns:
+        bool: False if tracing was already running (baseline left untouched).
+    """
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(MEMORY_TRACE_FRAMES)
+    take_baseline()
+    bot_logger.info("Memory tracing started (%d frames)", MEMORY_TRACE_FRAMES)
+    return True
+
+
+def stop_tracing():
+    """Stop tracemalloc and drop the baseline."""
+    global _baseline
+    tracemalloc.stop()
+    _baseline = None
+    bot_logger.info("Memory tracing stopped")
+
+
+def _format_size(size: int) -> str:
+    sign = "-" if size < 0 else "+"
+    size = abs(size)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{sign}{size:.0f} {unit}"
+        size /= 1024
+    return f"{sign}{size:.1f} GB"
+
+
+def _sizes_report() -> list[str]:
+    lines = ["Known structures (items):"]
+    lines += [f"  {name}: {items}" for name, items in get_sizes().items()]
+    lines.append("Caches (items, bytes):")
+    for name, stats in get_cache_stats().items():
+        line = f"  {name}: {stats['items']}"
+        if "bytes" in stats:
+            line += f", {stats['bytes'] / 1024:.0f} KB on disk"
+            line += f", {stats['memory_bytes'] / 1024:.0f} KB in memory"
+        lines.append(line)
+    return lines
+
+
+def memory_report(limit: int = MEMORY_TOP_N) -> str:
+    """
+    Diff the allocations against the baseline and render the growing sites.
+    CPU heavy: run it in a worker thread.
+
+    Args:
+        limit (int): Allocation sites listed.
+
+    Returns:
+        str: Plain-text report.
+    """
+    lines = []
+    if tracemalloc.is_tracing() and _baseline is not None:
+        taken_at, baseline = _baseline
+        snapshot = tracemalloc.take_snapshot().filter_traces(_NOISE_FILTERS)
+        current, peak = tracemalloc.get_traced_memory()
+        lines += [
+            f"Traced memory: {current / 1024 / 1024:.1f} MB "
+            f"(peak {peak / 1024 / 1024:.1f} MB), "
+            f"baseline {(time.monotonic() - taken_at) / 60:.0f} min ago",
+            "",
+            "Top growing allocation sites:",
+        ]
+        stats = snapshot.compare_to(baseline, "lineno")
+        growing = [s for s in stats if s.size_diff > 0][:limit]
+        for stat in growing:
+            frame = stat.traceback[0]
+            lines.append(
+                f"{_format_size(stat.size_diff):>10} {stat.count_diff:+7d} blocks"
+                f"  {frame.filename}:{frame.lineno}"
+                f"  (now {stat.size / 1024:.0f} KB)"
+            )
+        if not growing:
+            lines.append("  none")
+    else:
+        lines.append("Memory tracing is off.")
+    lines.append("")
+    lines += _sizes_report()
+    return "\n".join(lines) + "\n"
+
+
+async def run_memory_action(action: str):
+    """
+    Run an admin memory action without blocking the event loop.
+
+    Args:
+        action (str): "diff", "start", "baseline" or "stop".
+
+    Returns:
+        tuple[str, str | None]: Translation key of the reply and, for "diff",
+        the report to attach.
+    """
+    if action == "start":
+        started = await asyncio.to_thread(start_tracing)
+        return ("memory_started" if started else "memory_already_tracing"), None
+    if action == "stop":
+        stop_tracing()
+        return "memory_stopped", None
+    if action == "baseline":
+        if not is_tracing():
+            return "memory_not_tracing", None
+        await asyncio.to_thread(take_baseline)
+        return "memory_baseline", None
+    return "memory_report", await asyncio.to_thread(memory_report)
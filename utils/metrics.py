@@ -0,0 +1,404 @@
+# utils/metrics.py
+
+"""
+In-process metrics registry (counters, gauges, histograms) exposed in the
+Prometheus text format on a local HTTP endpoint started by bot_launcher.
+"""
+
+import math
+import time
+import asyncio
+import threading
+import tracemalloc
+
+from contextlib import contextmanager
+
+from aiohttp import web
+
+from utils.logger import service_logger, error_logger, get_log_stats
+from utils.cache import get_cache_stats
+from utils.perf import record_upstream, get_queue_depths, get_rss_bytes
+from utils.memory import get_sizes, is_tracing
+from utils.tracing import span, SPAN_KIND_CLIENT
+from utils.config import METRICS_HOST, METRICS_PORT
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+metrics_registry = []
+metrics_loop = None  # Event loop being monitored, set by start_metrics_server
+
+# Called with (service, seconds, ok) after every upstream call; set by
+# utils.request_context to record the calls made by each request
+_upstream_observer = None
+
+
+def _label_key(labelnames, labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value) -> str:
+    """Render a sample value or bucket bound at full precision."""
+    if isinstance(value, int):
+        return str(int(value))  # bool included
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _format_labels(labelnames, values, extra=()) -> str:
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Metric:
+    """
+    Base class: a named metric with label names, registered on creation.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        metrics_registry.append(self)
+
+    def samples(self):
+        """Yield (suffix, label values, extra labels, value) for rendering."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", key, (), value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for suffix, key, extra, value in self.samples():
+            labels = _format_labels(self.labelnames, key, extra)
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down. With a callback, the value is computed at
+    scrape time: the callback returns a number, or {label values tuple: number}.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, description, labelnames=(), callback=None):
+        super().__init__(name, description, labelnames)
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(self.labelnames, labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        if self.callback is None:
+            yield from super().samples()
+            return
+        try:
+            result = self.callback()
+        except Exception as e:
+            error_logger.error("Metric callback %s failed: %s", self.name, str(e))
+            return
+        if isinstance(result, dict):
+            for key, value in result.items():
+                yield "", key if isinstance(key, tuple) else (key,), (), value
+        else:
+            yield "", (), (), result
+
+
+class Histogram(Metric):
+    """Distribution of observed values over cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += 1
+            state[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(k, ([*v[0]], v[1], v[2])) for k, v in self._values.items()]
+        for key, (counts, count, total) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield "_bucket", key, (("le", _format_value(bound)),), bucket_count
+            yield "_bucket", key, (("le", "+Inf"),), count
+            yield "_sum", key, (), total
+            yield "_count", key, (), count
+
+
+def render_metrics() -> str:
+    """
+    Render every registered metric in the Prometheus text format.
+
+    Returns:
+        str: Exposition text.
+    """
+    lines = []
+    for metric in metrics_registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Requests (opened by utils.request_context) ---
+requests_total = Counter(
+    "coffy_requests_total",
+    "Requests handled, by platform, command and outcome.",
+    ("platform", "command", "outcome"),
+)
+request_duration = Histogram(
+    "coffy_request_duration_seconds",
+    "End-to-end request latency.",
+    ("platform", "command"),
+)
+requests_in_flight = Gauge(
+    "coffy_requests_in_flight", "Requests being served.", ("platform",)
+)
+stage_duration = Histogram(
+    "coffy_request_stage_seconds",
+    "Time spent per request stage (queue, context, extract, llm, send, db...).",
+    ("stage",),
+)
+
+# --- Upstream services ---
+upstream_duration = Histogram(
+    "coffy_upstream_duration_seconds",
+    "Latency of calls to upstream services.",
+    ("service",),
+)
+upstream_errors = Counter(
+    "coffy_upstream_errors_total",
+    "Failed calls to upstream services.",
+    ("service",),
+)
+
+# --- Event loop (fed by utils.loop_watchdog) ---
+loop_lag = Gauge(
+    "coffy_event_loop_lag_seconds", "Latest measured event loop scheduling delay."
+)
+loop_lag_histogram = Histogram(
+    "coffy_event_loop_lag_distribution_seconds",
+    "Event loop scheduling delay.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+loop_stalls = Counter(
+    "coffy_event_loop_stalls_total",
+    "Times the event loop was blocked longer than LOOP_SLOW_THRESHOLD.",
+)
+
+
+def record_upstream_call(service: str, seconds: float, ok: bool = True):
+    """
+    Record a finished call to an upstream service in the metrics and in the
+    performance dashboard.
+
+    Args:
+        service (str): Service name (gemini, openweather, wikipedia, gtts...).
+        seconds (float): Call duration.
+        ok (bool): False if the call failed.
+    """
+    upstream_duration.observe(seconds, service=service)
+    if not ok:
+        upstream_errors.inc(service=service)
+    record_upstream(service, seconds, ok)
+    if _upstream_observer is not None:
+        _upstream_observer(service, seconds, ok)
+
+
+def set_upstream_observer(observer):
+    """
+    Set the function notified after every upstream call.
+
+    Args:
+        observer (Callable[[str, float, bool], None] | None): Receives the
+            service name, the duration and whether the call succeeded.
+    """
+    global _upstream_observer
+    _upstream_observer = observer
+
+
+@contextmanager
+def observe_upstream(service: str):
+    """
+    Time (and trace) a call to an upstream service; exceptions are counted
+    as errors.
+
+    Args:
+        service (str): Service name (gemini, openweather, wikipedia, gtts...).
+    """
+    start = time.perf_counter()
+    ok = False
+    try:
+        with span(service, SPAN_KIND_CLIENT, service=service):
+            yield
+        ok = True
+    finally:
+        record_upstream_call(service, time.perf_counter() - start, ok)
+
+
+def _cache_metric(field):
+    return lambda: {
+        (name,): stats.get(field, 0) for name, stats in get_cache_stats().items()
+    }
+
+
+Gauge("coffy_cache_items", "Entries per cache.", ("cache",), _cache_metric("items"))
+Gauge(
+    "coffy_cache_hit_ratio",
+    "Hit ratio per cache since start.",
+    ("cache",),
+    _cache_metric("hit_ratio"),
+)
+Gauge(
+    "coffy_cache_bytes",
+    "Bytes held by size-capped caches, per tier.",
+    ("cache", "tier"),
+    lambda: {
+        (name, tier): stats[field]
+        for name, stats in get_cache_stats().items()
+        for tier, field in (("disk", "bytes"), ("memory", "memory_bytes"))
+        if field in stats
+    },
+)
+Gauge(
+    "coffy_structure_items",
+    "Items in known in-memory structures (message cache, catalogs...).",
+    ("structure",),
+    lambda: {(name,): items for name, items in get_sizes().items()},
+)
+Gauge(
+    "coffy_process_resident_bytes",
+    "Resident set size of the process.",
+    callback=lambda: get_rss_bytes() or 0,
+)
+Gauge(
+    "coffy_traced_memory_bytes",
+    "Memory traced by tracemalloc (when enabled).",
+    ("kind",),
+    lambda: (
+        dict(zip([("current",), ("peak",)], tracemalloc.get_traced_memory()))
+        if is_tracing()
+        else {}
+    ),
+)
+Gauge(
+    "coffy_log_queue_depth",
+    "Records waiting for the log writer.",
+    callback=lambda: get_log_stats()["queued"],
+)
+Gauge(
+    "coffy_log_records_dropped",
+    "Log records dropped on a full queue, per log file.",
+    ("file",),
+    lambda: {(f,): n for f, n in get_log_stats()["dropped"].items()},
+)
+Gauge(
+    "coffy_queue_depth",
+    "Items waiting in internal queues (DB writes, logs).",
+    ("queue",),
+    lambda: {(name,): depth for name, depth in get_queue_depths().items()},
+)
+Gauge(
+    "coffy_asyncio_tasks",
+    "Tasks alive in the event loop.",
+    callback=lambda: len(asyncio.all_tasks(metrics_loop)) if metrics_loop else 0,
+)
+
+
+async def handle_metrics(request):
+    text = await asyncio.to_thread(render_metrics)
+    return web.Response(text=text, content_type="text/plain", charset="utf-8")
+
+
+async def start_metrics_server():
+    """
+    Start the metrics endpoint. Disabled when METRICS_PORT is 0.
+
+    Returns:
+        list: Objects to pass to stop_metrics_server().
+    """
+    global metrics_loop
+    metrics_loop = asyncio.get_running_loop()
+    if not METRICS_PORT:
+        return []
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+        service_logger.info(
+            "Metrics endpoint on http://%s:%s/metrics", METRICS_HOST, METRICS_PORT
+        )
+    except OSError as e:
+        error_logger.error("Metrics endpoint not started: %s", str(e))
+    return [runner]
+
+
+async def stop_metrics_server(handles):
+    """
+    Stop what start_metrics_server() started.
+
+    Args:
+        handles (list): Value returned by start_metrics_server().
+    """
+    for runner in handles:
+        await runner.cleanup()
@@ -0,0 +1,316 @@
+# utils/perf.py
+
+"""
+Live performance figures for the admin dashboard (/chatty-admin-perf).
+Request and upstream latencies are kept in fixed-size in-memory ring buffers,
+so recording is O(1) and a report only sorts the samples of the requested
+window. Cache hit ratios are computed from periodic counter snapshots, and
+queues (DB writes, logs) register a depth callback like caches do.
+"""
+
+import sys
+import time
+import threading
+
+from collections import deque
+
+from utils.cache import get_cache_stats
+from utils.localization import translate
+from utils.logger import get_log_stats
+from utils.memory import register_size
+from utils.config import (
+    PERF_SAMPLES,
+    PERF_TOTAL_SAMPLES,
+    PERF_WINDOW,
+    PERF_MAX_WINDOW,
+    PERF_SNAPSHOT_INTERVAL,
+    PERF_TOP_N,
+)
+
+queue_registry = {}  # queue name -> callable returning its depth
+
+
+def register_queue(name: str, depth):
+    """
+    Register a queue whose depth is shown in the dashboard.
+
+    Args:
+        name (str): Queue name.
+        depth (Callable[[], int]): Returns the number of waiting items.
+    """
+    queue_registry[name] = depth
+
+
+def get_queue_depths() -> dict:
+    """
+    Return the depth of every registered queue.
+
+    Returns:
+        dict: Mapping of queue name -> waiting items.
+    """
+    return {name: depth() for name, depth in queue_registry.items()}
+
+
+register_queue("logs", lambda: get_log_stats()["queued"])
+
+
+class RollingWindow:
+    """
+    Ring buffer of (timestamp, seconds, ok) samples; the oldest samples are
+    overwritten once it is full.
+    """
+
+    def __init__(self, size: int = PERF_SAMPLES):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float, ok: bool = True):
+        """Record one sample."""
+        with self._lock:
+            self._samples.append((time.monotonic(), seconds, ok))
+
+    def __len__(self):
+        return len(self._samples)
+
+    def since(self, window: float) -> list:
+        """Return the samples of the last `window` seconds."""
+        cutoff = time.monotonic() - window
+        with self._lock:
+            samples = list(self._samples)
+        # Samples are in time order: skip the expired head
+        start = 0
+        while start < len(samples) and samples[start][0] < cutoff:
+            start += 1
+        return samples[start:]
+
+    def summary(self, window: float):
+        """
+        Summarize the samples of the last `window` seconds.
+
+        Returns:
+            dict | None: count, errors, p50, p95, p99 (seconds), or None if empty.
+        """
+        samples = self.since(window)
+        if not samples:
+            return None
+        values = sorted(s[1] for s in samples)
+        return {
+            "count": len(values),
+            "errors": sum(1 for s in samples if not s[2]),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """
+    Return the nearest-rank percentile of already sorted values.
+
+    Args:
+        sorted_values (list): Non-empty list in ascending order.
+        pct (float): Percentile, 0-100.
+
+    Returns:
+        float: The percentile value.
+    """
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+command_windows = {}  # "platform/command" -> RollingWindow
+service_windows = {}  # upstream service -> RollingWindow
+all_requests = RollingWindow(PERF_TOTAL_SAMPLES)
+cache_snapshots = deque(maxlen=PERF_MAX_WINDOW // PERF_SNAPSHOT_INTERVAL + 1)
+_windows_lock = threading.Lock()
+register_size(
+    "perf_samples",
+    lambda: sum(len(w) for w in [*command_windows.values(), *service_windows.values()]),
+)
+
+
+def _window(windows: dict, key: str) -> RollingWindow:
+    window = windows.get(key)
+    if window is None:
+        with _windows_lock:
+            window = windows.setdefault(key, RollingWindow())
+    return window
+
+
+def _snapshot_caches():
+    """Keep cache hit/miss counters every PERF_SNAPSHOT_INTERVAL seconds."""
+    now = time.monotonic()
+    if cache_snapshots and now - cache_snapshots[-1][0] < PERF_SNAPSHOT_INTERVAL:
+        return
+    counters = {
+        name: (stats.get("hits", 0), stats.get("misses", 0))
+        for name, stats in get_cache_stats().items()
+    }
+    cache_snapshots.append((now, counters))
+
+
+def record_request(platform: str, command: str, seconds: float, ok: bool = True):
+    """
+    Record a finished request.
+
+    Args:
+        platform (str): "discord" or "telegram".
+        command (str): Command or trigger name.
+        seconds (float): End-to-end duration.
+        ok (bool): False if the request failed.
+    """
+    _window(command_windows, f"{platform}/{command}").add(seconds, ok)
+    all_requests.add(seconds, ok)
+    _snapshot_caches()
+
+
+def record_upstream(service: str, seconds: float, ok: bool = True):
+    """
+    Record a call to an upstream service.
+
+    Args:
+        service (str): Service name (gemini, openweather, wikipedia, sqlite...).
+        seconds (float): Call duration.
+        ok (bool): False if the call failed.
+    """
+    _window(service_windows, service).add(seconds, ok)
+
+
+def cache_hit_ratios(window: float) -> dict:
+    """
+    Return the hit ratio of each cache over roughly the last `window` seconds.
+
+    Returns:
+        dict: cache name -> (hit ratio, lookups).
+    """
+    cutoff = time.monotonic() - window
+    snapshots = list(cache_snapshots)
+    # Oldest snapshot inside the window, else the latest one (idle window)
+    baseline = snapshots[-1][1] if snapshots else {}
+    for taken_at, counters in snapshots:
+        if taken_at >= cutoff:
+            baseline = counters
+            break
+    ratios = {}
+    for name, stats in get_cache_stats().items():
+        base_hits, base_misses = baseline.get(name, (0, 0))
+        hits = stats.get("hits", 0) - base_hits
+        lookups = hits + stats.get("misses", 0) - base_misses
+        ratios[name] = (hits / lookups if lookups else 0.0, lookups)
+    return ratios
+
+
+def get_rss_bytes():
+    """
+    Return the resident set size of the process.
+
+    Returns:
+        int | None: Current RSS in bytes (peak RSS where the current value is
+        unavailable), or None if it cannot be read.
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def perf_snapshot(window: float = PERF_WINDOW) -> dict:
+    """
+    Collect every dashboard figure for the last `window` seconds.
+
+    Args:
+        window (float): Window length in seconds, capped at PERF_MAX_WINDOW.
+
+    Returns:
+        dict: window, requests, commands, services, caches, queues, rss.
+    """
+    window = max(1, min(window, PERF_MAX_WINDOW))
+    return {
+        "window": window,
+        "requests": all_requests.summary(window),
+        "commands": {k: w.summary(window) for k, w in list(command_windows.items())},
+        "services": {k: w.summary(window) for k, w in list(service_windows.items())},
+        "caches": cache_hit_ratios(window),
+        "queues": get_queue_depths(),
+        "rss": get_rss_bytes(),
+    }
+
+
+def _format_latencies(summaries: dict) -> str:
+    rows = sorted(
+        ((k, s) for k, s in summaries.items() if s),
+        key=lambda item: item[1]["count"],
+        reverse=True,
+    )[:PERF_TOP_N]
+    if not rows:
+        return translate("perf_no_data")
+    width = max(len(k) for k, _ in rows)
+    lines = []
+    for key, s in rows:
+        line = (
+            f"{key:<{width}} {s['p50'] * 1000:6.0f} {s['p95'] * 1000:6.0f} "
+            f"{s['p99'] * 1000:6.0f} ms  n={s['count']}"
+        )
+        if s["errors"]:
+            line += f" err={s['errors']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def format_perf_report(window: float = PERF_WINDOW) -> str:
+    """
+    Render the dashboard as plain text, for admin commands.
+
+    Args:
+        window (float): Window length in seconds.
+
+    Returns:
+        str: Multi-line report.
+    """
+    snap = perf_snapshot(window)
+    window = snap["window"]
+    requests = snap["requests"]
+    if requests:
+        summary = translate(
+            "perf_requests",
+            rate=f"{requests['count'] / window:.2f}",
+            errors=f"{requests['errors'] / requests['count']:.1%}",
+            count=requests["count"],
+        )
+    else:
+        summary = translate("perf_no_data")
+
+    rss = snap["rss"]
+    caches = "\n".join(
+        f"{name}: {ratio:.0%} ({lookups})"
+        for name, (ratio, lookups) in snap["caches"].items()
+    )
+    queues = "\n".join(f"{name}: {depth}" for name, depth in snap["queues"].items())
+    return "\n".join(
+        [
+            translate("perf_title", minutes=f"{window / 60:g}"),
+            summary,
+            translate("perf_rss", rss=f"{rss / 1024 / 1024:.0f} MB" if rss else "n/a"),
+            "",
+            translate("perf_commands_title"),
+            _format_latencies(snap["commands"]),
+            "",
+            translate("perf_services_title"),
+            _format_latencies(snap["services"]),
+            "",
+            translate("embed_cache_title"),
+            caches or "None",
+            "",
+            translate("perf_queues_title"),
+            queues or "None",
+        ]
+    )
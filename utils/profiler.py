@@ -0,0 +1,176 @@
+# utils/profiler.py
+
+"""
+On-demand sampling profiler for the running bot.
+A background thread periodically reads the stack of every other thread
+(event loop thread included) through sys._current_frames(), so nothing has
+to be attached or instrumented and the overhead stays low. The result is a
+collapsed-stack file (one "frame;frame;frame count" line per distinct stack,
+readable by flamegraph.pl and speedscope) plus a top-functions summary.
+Only one profile runs at a time.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+
+from collections import Counter
+from datetime import datetime
+
+from utils.logger import bot_logger
+from utils.config import PROFILER_INTERVAL, PROFILER_TOP_N
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Leaf functions of threads that are waiting, not working
+IDLE_FUNCTIONS = (
+    "Condition.wait",
+    "Event.wait",
+    "EpollSelector.select",
+    "KqueueSelector.select",
+    "SelectSelector.select",
+    "IocpProactor._poll",
+)
+
+_profile_lock = threading.Lock()
+
+
+class ProfileResult:
+    """
+    Collected samples of a finished profile.
+    """
+
+    def __init__(self, stacks: Counter, samples: int, seconds: float):
+        self.stacks = stacks  # collapsed stack -> samples
+        self.samples = samples  # sampling rounds
+        self.seconds = seconds
+        self.created_at = datetime.now()
+
+    def collapsed(self) -> str:
+        """Return the profile in the collapsed-stack format."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def top_functions(self, limit: int = PROFILER_TOP_N):
+        """
+        Return the functions seen most often.
+
+        Returns:
+            tuple[list, list]: (function, samples) pairs by self time (the
+            function was running, idle waits excluded) and by total time
+            (it was on the stack).
+        """
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]  # Drop the thread name
+            if not frames:
+                continue
+            if not frames[-1].startswith(IDLE_FUNCTIONS):
+                own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        return own.most_common(limit), total.most_common(limit)
+
+    def summary(self) -> str:
+        """Return a plain-text summary of the busiest functions."""
+        by_self, by_total = self.top_functions()
+        rounds = self.samples or 1
+        lines = [
+            f"Profile of {self.seconds:.1f}s, {self.samples} samples every "
+            f"{PROFILER_INTERVAL * 1000:g} ms, taken {self.created_at:%Y-%m-%d %H:%M:%S}",
+            "",
+            "Self time (function running, % of samples):",
+        ]
+        lines += [f"{c / rounds:6.1%}  {f}" for f, c in by_self]
+        lines += ["", "Total time (function on a stack, % of samples):"]
+        lines += [f"{c / rounds:6.1%}  {f}" for f, c in by_total]
+        return "\n".join(lines) + "\n"
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename
+    if path.startswith(PROJECT_DIR):
+        path = os.path.relpath(path, PROJECT_DIR)
+    else:
+        path = "/".join(path.replace("\\", "/").split("/")[-2:])
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _collapse(frame) -> list[str]:
+    """Return the frames of a stack, outermost first."""
+    frames = []
+    while frame is not None:
+        frames.append(_frame_name(frame))
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def sample_stacks(seconds: float, interval: float = PROFILER_INTERVAL):
+    """
+    Sample the stacks of every other thread for the given time. Blocking:
+    run it in a worker thread.
+
+    Args:
+        seconds (float): Profile duration.
+        interval (float): Seconds between samples.
+
+    Returns:
+        ProfileResult: The collected samples.
+    """
+    own_id = threading.get_ident()
+    stacks = Counter()
+    samples = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            thread_name = names.get(thread_id, str(thread_id)).replace(";", ":")
+            stacks[";".join([thread_name, *_collapse(frame)])] += 1
+        samples += 1
+        time.sleep(interval)
+    return ProfileResult(stacks, samples, time.perf_counter() - start)
+
+
+def is_profiling() -> bool:
+    """
+    Tell whether a profile is running.
+
+    Returns:
+        bool: True while a profile is being taken.
+    """
+    return _profile_lock.locked()
+
+
+async def run_profile(seconds: float):
+    """
+    Profile the bot for the given time without blocking the event loop.
+
+    Args:
+        seconds (float): Profile duration.
+
+    Returns:
+        ProfileResult | None: The profile, or None if another one is running.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        bot_logger.info("Sampling profile started for %ss", seconds)
+        result = await asyncio.to_thread(sample_stacks, seconds)
+        bot_logger.info(
+            "Sampling profile finished: %d samples, %d distinct stacks",
+            result.samples,
+            len(result.stacks),
+        )
+        return result
+    finally:
+        _profile_lock.release()
@@ -0,0 +1,314 @@
+# utils/request_context.py
+
+"""
+Per-request context carried through contextvars.
+Each entry point (Discord message or command, Telegram handler) opens a
+RequestContext; code down the call chain (core.handler, services) adds stage
+timings, token counts, sizes, upstream calls, cache decisions and the
+outcome. When the request ends, one JSON record is written to requests.log,
+and every log line written meanwhile carries the request id. Requests slower
+than their command threshold are also written, with every detail, to
+slow.log.
+"""
+
+import json
+import time
+import uuid
+import threading
+
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from utils.logger import setup_logger, request_id_var
+from utils.metrics import (
+    requests_total,
+    request_duration,
+    requests_in_flight,
+    stage_duration,
+    set_upstream_observer,
+)
+from utils.cache import set_lookup_observer
+from utils.perf import record_request
+from utils.tracing import trace_root, span
+from utils.config import (
+    SLOW_LOG_FILE,
+    SLOW_REQUEST_THRESHOLD,
+    SLOW_REQUEST_THRESHOLDS,
+    SLOW_LOG_MAX_PER_MINUTE,
+)
+
+request_logger = setup_logger("requests", "requests.log", fmt="%(message)s")
+slow_logger = setup_logger("slow", SLOW_LOG_FILE, fmt="%(message)s")
+
+current_request = ContextVar("current_request", default=None)
+
+
+class RequestContext:
+    """
+    Timings, token counts, sizes, upstream calls, cache decisions and outcome
+    of a single user request.
+    """
+
+    def __init__(self, platform: str, command: str, server=None, user_id=None):
+        self.request_id = uuid.uuid4().hex[:12]
+        self.platform = platform
+        self.command = command
+        self.server = server
+        self.user_id = str(user_id) if user_id is not None else None
+        self.started_at = time.perf_counter()
+        self.timestamp = datetime.now(timezone.utc)
+        self.stages = {}  # stage name -> seconds (summed if repeated)
+        self.tokens = {"prompt": 0, "output": 0}
+        self.outcome = "ok"
+        self.error = None
+        self.trace_id = None  # Set when the request is sampled for tracing
+        self.details = {}  # model, prompt_chars, images...
+        self.attachments = []  # {"name", "bytes"} of each attachment read
+        self.upstream = {}  # service -> {"calls", "errors", "ms"}
+        self.cache = {}  # "cache:decision" -> count
+
+    def add_stage(self, name: str, seconds: float):
+        """Add time spent in a stage."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block (sync or async code) as the given stage."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_stage(name, time.perf_counter() - start)
+
+    def add_tokens(self, prompt: int = 0, output: int = 0):
+        """Add model token usage."""
+        self.tokens["prompt"] += prompt or 0
+        self.tokens["output"] += output or 0
+
+    def add_upstream_call(self, service: str, seconds: float, ok: bool):
+        """Count a call to an upstream service."""
+        calls = self.upstream.setdefault(service, {"calls": 0, "errors": 0, "ms": 0.0})
+        calls["calls"] += 1
+        calls["errors"] += 0 if ok else 1
+        calls["ms"] = round(calls["ms"] + seconds * 1000, 1)
+
+    def add_cache_decision(self, cache: str, decision: str):
+        """Count a cache lookup result (hit, miss, expired, stale...)."""
+        key = f"{cache}:{decision}"
+        self.cache[key] = self.cache.get(key, 0) + 1
+
+    def set_outcome(self, outcome: str, error=None):
+        """Record how the request ended (e.g. "ok", "llm_error", "error")."""
+        self.outcome = outcome
+        if error is not None:
+            self.error = str(error)[:300]
+
+    def to_record(self) -> dict:
+        """Return the request as a JSON-serializable dictionary."""
+        return {
+            "request_id": self.request_id,
+            "timestamp": self.timestamp.isoformat(timespec="milliseconds"),
+            "platform": self.platform,
+            "server": self.server,
+            "user_id": self.user_id,
+            "command": self.command,
+            "duration_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+            "stages_ms": {k: round(v * 1000, 1) for k, v in self.stages.items()},
+            "tokens": self.tokens,
+            "outcome": self.outcome,
+            "error": self.error,
+            "trace_id": self.trace_id,
+        }
+
+
+def get_request():
+    """
+    Return the context of the request being served.
+
+    Returns:
+        RequestContext | None: The current request, or None outside a request.
+    """
+    return current_request.get()
+
+
+@contextmanager
+def request_scope(
+    platform: str, command: str, server=None, user_id=None, queued_at=None
+):
+    """
+    Open a request context (and, if sampled, a trace) for the enclosed block
+    and log it when the block ends.
+    Exceptions mark the outcome as "error" and are re-raised.
+
+    Args:
+        platform (str): "discord" or "telegram".
+        command (str): Command or trigger name.
+        server (str, optional): Server/chat name.
+        user_id (optional): Id of the requesting user.
+        queued_at (datetime, optional): When the platform received the message;
+            the delay until now is recorded as the "queue" stage.
+
+    Yields:
+        RequestContext: The new request context.
+    """
+    ctx = RequestContext(platform, command, server, user_id)
+    if queued_at is not None:
+        ctx.add_stage("queue", max(0.0, (ctx.timestamp - queued_at).total_seconds()))
+    token = current_request.set(ctx)
+    id_token = request_id_var.set(ctx.request_id)
+    requests_in_flight.inc(platform=platform)
+    with trace_root(
+        f"{platform} {command}",
+        platform=platform,
+        command=command,
+        server=server,
+        user_id=ctx.user_id,
+        request_id=ctx.request_id,
+        queue_ms=round(ctx.stages.get("queue", 0.0) * 1000, 1),
+    ) as root:
+        if root:
+            ctx.trace_id = root.trace_id
+        try:
+            yield ctx
+        except BaseException as e:
+            ctx.set_outcome("error", e)
+            raise
+        finally:
+            requests_in_flight.dec(platform=platform)
+            if root:
+                root.set_attribute("outcome", ctx.outcome)
+                if ctx.error:
+                    root.set_error(ctx.error)
+            record_request_metrics(ctx)
+            request_logger.info(json.dumps(ctx.to_record(), ensure_ascii=False))
+            slow_requests.capture(ctx)
+            request_id_var.reset(id_token)
+            current_request.reset(token)
+
+
+def record_request_metrics(ctx: RequestContext):
+    """Feed a finished request into the metrics registry and the dashboard."""
+    seconds = time.perf_counter() - ctx.started_at
+    requests_total.inc(platform=ctx.platform, command=ctx.command, outcome=ctx.outcome)
+    request_duration.observe(seconds, platform=ctx.platform, command=ctx.command)
+    record_request(
+        ctx.platform, ctx.command, seconds, ok=not ctx.outcome.endswith("error")
+    )
+    for stage, seconds in ctx.stages.items():
+        stage_duration.observe(seconds, stage=stage)
+
+
+class SlowRequestLog:
+    """
+    Writes requests slower than their command threshold to slow.log, with
+    every detail collected, at most SLOW_LOG_MAX_PER_MINUTE per minute.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._minute = None
+        self._written = 0
+        self.suppressed = 0  # Captures dropped by the rate limit, not logged yet
+
+    @staticmethod
+    def threshold(command: str):
+        """
+        Return the latency threshold of a command.
+
+        Returns:
+            float | None: Seconds, or None if the command is never captured.
+        """
+        return SLOW_REQUEST_THRESHOLDS.get(
+            command.replace("-", "_"), SLOW_REQUEST_THRESHOLD
+        )
+
+    def capture(self, ctx: RequestContext):
+        """Log the request if it was slower than its threshold."""
+        threshold = self.threshold(ctx.command)
+        if threshold is None:
+            return
+        if time.perf_counter() - ctx.started_at < threshold:
+            return
+        with self._lock:
+            minute = int(time.monotonic() // 60)
+            if minute != self._minute:
+                self._minute = minute
+                self._written = 0
+            if self._written >= SLOW_LOG_MAX_PER_MINUTE:
+                self.suppressed += 1
+                return
+            self._written += 1
+            suppressed, self.suppressed = self.suppressed, 0
+        record = ctx.to_record()
+        record.update(
+            threshold_ms=round(threshold * 1000),
+            details=ctx.details,
+            attachments=ctx.attachments,
+            upstream=ctx.upstream,
+            cache=ctx.cache,
+            suppressed_before=suppressed,
+        )
+        slow_logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+slow_requests = SlowRequestLog()
+
+
+@contextmanager
+def track_stage(name: str):
+    """
+    Time the enclosed block as a stage of the current request, if any,
+    and trace it as a span when the request is sampled.
+
+    Args:
+        name (str): Stage name (context, extract, llm, send, db...).
+    """
+    ctx = current_request.get()
+    with span(name), ctx.stage(name) if ctx else nullcontext():
+        yield
+
+
+def set_request_outcome(outcome: str, error=None):
+    """Record the outcome of the current request, if any."""
+    ctx = current_request.get()
+    if ctx:
+        ctx.set_outcome(outcome, error)
+
+
+def add_request_tokens(prompt: int = 0, output: int = 0):
+    """Add model token usage to the current request, if any."""
+    ctx = current_request.get()
+    if ctx:
+        ctx.add_tokens(prompt, output)
+
+
+def note_request(**details):
+    """Attach details (model, prompt_chars...) to the current request, if any."""
+    ctx = current_request.get()
+    if ctx:
+        ctx.details.update(details)
+
+
+def note_request_attachment(filename: str, size: int):
+    """Record the size of an attachment read by the current request, if any."""
+    ctx = current_request.get()
+    if ctx:
+        ctx.attachments.append({"name": filename, "bytes": size})
+
+
+def record_cache_decision(cache: str, decision: str):
+    """Count a cache lookup result for the current request, if any."""
+    ctx = current_request.get()
+    if ctx:
+        ctx.add_cache_decision(cache, decision)
+
+
+def _record_upstream_call(service: str, seconds: float, ok: bool):
+    ctx = current_request.get()
+    if ctx:
+        ctx.add_upstream_call(service, seconds, ok)
+
+
+set_lookup_observer(record_cache_decision)
+set_upstream_observer(_record_upstream_call)
@@ -0,0 +1,94 @@
+# utils/text.py
+
+"""
+Plain-text helpers: token estimation and chunking.
+"""
+
+import re
+
+from utils.config import CHARS_PER_TOKEN
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of model tokens in a text.
+
+    Args:
+        text (str): Input text.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list[str]:
+    """
+    Split text into chunks of at most max_tokens (estimated),
+    preferring paragraph and line boundaries.
+
+    Args:
+        text (str): Text to split.
+        max_tokens (int): Token budget per chunk.
+
+    Returns:
+        list[str]: Non-empty chunks, in document order.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = ""
+
+    for block in re.split(r"(\n\s*\n|\n)", text):
+        if len(current) + len(block) <= max_chars:
+            current += block
+            continue
+        if current.strip():
+            chunks.append(current.strip())
+        # A single block longer than the budget is hard-split
+        while len(block) > max_chars:
+            chunks.append(block[:max_chars].strip())
+            block = block[max_chars:]
+        current = block
+
+    if current.strip():
+        chunks.append(current.strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+def split_sentences(text: str, max_chars: int) -> list[str]:
+    """
+    Split text at sentence boundaries into chunks of at most max_chars,
+    merging short sentences together. Sentences longer than the limit are
+    split at the last space before it.
+
+    Args:
+        text (str): Text to split.
+        max_chars (int): Maximum chunk length.
+
+    Returns:
+        list[str]: Non-empty chunks, in order.
+    """
+    chunks = []
+    current = ""
+
+    for sentence in re.split(r"(?<=[.!?…;:])\s+|\n+", text.strip()):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+
+    if current:
+        chunks.append(current)
+    return chunks
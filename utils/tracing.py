@@ -0,0 +1,216 @@
+# utils/tracing.py
+
+"""
+Minimal tracing.
+A request opens a root span (trace_root); code down the call chain opens
+child spans (span) that nest through a ContextVar, across awaits, tasks and
+worker threads started with asyncio.to_thread. Whether a request is traced
+is decided once, when the root span starts (head sampling, TRACE_SAMPLE_RATE);
+spans of unsampled requests cost a ContextVar lookup. When the root span
+ends, the whole trace is written to logs/traces.jsonl as one OTLP JSON
+ExportTraceServiceRequest per line, the format of the OpenTelemetry file
+exporter, so it can be loaded in standard trace viewers offline.
+"""
+
+import json
+import os
+import random
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from utils.logger import setup_logger
+from utils.config import TRACE_SAMPLE_RATE, TRACE_LOG_FILE, TRACE_SERVICE_NAME
+
+trace_logger = setup_logger("traces", TRACE_LOG_FILE, fmt="%(message)s")
+
+current_span = ContextVar("current_span", default=None)
+
+# OTLP enums
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    """
+    A timed operation of a sampled trace.
+    """
+
+    def __init__(self, name: str, trace, parent=None, kind=SPAN_KIND_INTERNAL):
+        self.name = name
+        self.trace = trace  # Finished spans of the trace, shared by every span
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.kind = kind
+        self.attributes = {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = STATUS_OK
+        self.status_message = None
+
+    def set_attribute(self, key: str, value):
+        """Attach an attribute (str, int, float or bool)."""
+        self.attributes[key] = value
+
+    def set_error(self, error):
+        """Mark the span as failed."""
+        self.status = STATUS_ERROR
+        self.status_message = str(error)[:300]
+
+    def end(self):
+        """Finish the span and add it to its trace."""
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.append(self)
+
+    def to_otlp(self) -> dict:
+        """Return the span in the OTLP JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+def export_trace(spans: list):
+    """
+    Write the spans of a finished trace as one OTLP JSON line.
+
+    Args:
+        spans (list[Span]): Finished spans.
+    """
+    request = {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes({"service.name": TRACE_SERVICE_NAME})
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "utils.tracing"},
+                        "spans": [s.to_otlp() for s in spans],
+                    }
+                ],
+            }
+        ]
+    }
+    trace_logger.info(json.dumps(request, ensure_ascii=False))
+
+
+@contextmanager
+def _open_span(span: Span):
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(e)
+        raise
+    finally:
+        current_span.reset(token)
+        span.end()
+
+
+@contextmanager
+def trace_root(name: str, **attributes):
+    """
+    Start a trace for the enclosed block if the request is sampled.
+
+    Args:
+        name (str): Span name (e.g. "discord chatty").
+        **attributes: Span attributes.
+
+    Yields:
+        Span | None: The root span, or None if the request is not sampled.
+    """
+    if TRACE_SAMPLE_RATE <= 0 or random.random() >= TRACE_SAMPLE_RATE:
+        yield None
+        return
+    spans = []
+    root = Span(name, spans, kind=SPAN_KIND_SERVER)
+    root.attributes.update(attributes)
+    try:
+        with _open_span(root):
+            yield root
+    finally:
+        export_trace(spans)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """
+    Time the enclosed block as a child of the current span. No-op outside a
+    sampled trace.
+
+    Args:
+        name (str): Span name (e.g. "llm", "read_file_content").
+        kind (int): SPAN_KIND_INTERNAL or SPAN_KIND_CLIENT for outbound calls.
+        **attributes: Span attributes.
+
+    Yields:
+        Span | None: The new span, or None when not tracing.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, parent.trace, parent, kind)
+    child.attributes.update(attributes)
+    with _open_span(child):
+        yield child
+
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """
+    Start a child span that is ended explicitly with Span.end(), for code
+    that cannot use a with block (e.g. aiohttp trace callbacks). It does not
+    become the current span.
+
+    Returns:
+        Span | None: The new span, or None when not tracing.
+    """
+    parent = current_span.get()
+    if parent is None:
+        return None
+    child = Span(name, parent.trace, parent, kind)
+    child.attributes.update(attributes)
+    return child
+
+
+def set_span_attributes(**attributes):
+    """Attach attributes to the current span, if any."""
+    current = current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)